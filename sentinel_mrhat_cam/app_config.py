@@ -1,12 +1,50 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
 import logging
 import json
+import time
 from datetime import datetime
-from .static_config import CONFIG_PATH, CONFIGACK_TOPIC, MINIMUM_WAIT_TIME, MAXIMUM_WAIT_TIME
+from .static_config import CONFIG_PATH, CONFIGACK_TOPIC, MINIMUM_WAIT_TIME, MAXIMUM_WAIT_TIME, SHUTDOWN_THRESHOLD
 from .rtc import RTC
 from .mqtt import ICommunication
 import re
 
+# How the device waits for the next cycle of the active interval
+SHUTDOWN_UNTIL_END = "shutdown_until_end"
+SHUTDOWN_FOR_DURATION = "shutdown_for_duration"
+SLEEP_UNTIL_NEXT_CYCLE = "sleep_until_next_cycle"
+
+# Compiled once on import instead of on every validation
+_UUID_PATTERN = re.compile(r'^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB][0-9A-F]{3}-[0-9A-F]{12}$', re.IGNORECASE)
+_TIME_PATTERN = re.compile(r'^(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d$')
+
+
+@dataclass(frozen=True)
+class ActiveConfig:
+    """
+    The settings of the timing interval that contains the current time.
+
+    Attributes
+    ----------
+    uuid : str
+        The uuid of the config the interval belongs to.
+    quality : str
+        The quality of the captured images.
+    period : int
+        The time between two images in seconds, -1 if no images are taken in the interval.
+    start : str
+        The start of the interval in HH:MM:SS format.
+    end : str
+        The end of the interval in HH:MM:SS format.
+    """
+    # Declared by hand, dataclass only generates slots from Python 3.10
+    __slots__ = ("uuid", "quality", "period", "start", "end")
+    uuid: str
+    quality: str
+    period: int
+    start: str
+    end: str
+
 
 class Config:
     def __init__(self, mqtt: ICommunication):
@@ -24,7 +62,13 @@ class Config:
         """
         self._path: str = CONFIG_PATH
         self._full_config: dict[str, Any] = {}
-        self.active: dict[str, Any] = {}
+        self.active: Optional[ActiveConfig] = None
+        # The period of the active interval, kept as a plain attribute for the per-cycle scheduling
+        self.period: int = -1
+        # How to wait for the next cycle and the Unix timestamp of the end of the active interval,
+        # derived when loading. The active interval is reused across cycles until it ends
+        self.shutdown_mode: str = SHUTDOWN_UNTIL_END
+        self.end_epoch: Optional[int] = None
         try:
             self.load()
         except Exception as e:
@@ -37,7 +81,7 @@ class Config:
 
             # Load the default config
             self._full_config.update(Config._get_default_config())
-            self.active = self._set_active_config()
+            self._set_active_config()
             logging.error("Loading config failed, using default config")
 
     @staticmethod
@@ -83,6 +127,24 @@ class Config:
         }
         return default_config
 
+    @staticmethod
+    def _read_config(path: str) -> str:
+        """
+        Read the raw contents of the configuration file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the configuration file.
+
+        Returns
+        -------
+        str
+            The contents of the file.
+        """
+        with open(path, "r") as file:
+            return file.read()
+
     def load(self) -> None:
         """
         Load the configuration from the `sentinel_app_config.json` file.
@@ -103,8 +165,7 @@ class Config:
             If any other error occurs during the loading process.
         """
         try:
-            with open(self._path, "r") as file:
-                new_config: dict = json.load(file)
+            new_config: dict = json.loads(Config._read_config(self._path))
 
             Config.validate_config(new_config)
 
@@ -133,29 +194,63 @@ class Config:
 
             current_time = datetime.strptime(current_time_str, "%H:%M:%S").time()
 
-            active_config = {
-                "uuid": self._full_config["uuid"],
-                "quality": self._full_config["quality"]
-            }
-
             for timing in self._full_config['timing']:
-                start_time = datetime.strptime(timing['start'], "%H:%M:%S").time()
-                end_time = datetime.strptime(timing['end'], "%H:%M:%S").time()
+                start_time = RTC.parse_time(timing['start'])
+                end_time = RTC.parse_time(timing['end'])
 
                 if start_time <= current_time < end_time:
-                    active_config.update({
-                        "period": timing["period"],
-                        "start": timing["start"],
-                        "end": timing["end"]
-                    })
+                    active_config = ActiveConfig(
+                        uuid=self._full_config["uuid"],
+                        quality=self._full_config["quality"],
+                        period=timing["period"],
+                        start=timing["start"],
+                        end=timing["end"],
+                    )
                     break
+            else:
+                raise ValueError(f"No timing interval contains the current time {current_time_str}")
 
             self.active = active_config
+            self.period = active_config.period
+            self.end_epoch = RTC.to_epoch(active_config.end)
+            self._set_shutdown_mode()
 
         except Exception as e:
             logging.error(f"Error in _set_active_config method: {e}")
             raise
 
+    def _set_shutdown_mode(self) -> None:
+        """
+        Derive how the device waits for the next cycle from the period of the active interval.
+
+        - A period of -1 shuts the device down until the end of the interval.
+        - A period above `SHUTDOWN_THRESHOLD` shuts the device down between cycles, unless the
+          remaining waiting time turns out to be shorter than the threshold.
+        - Any other period always leaves a waiting time below the threshold, so the device sleeps.
+        """
+        if self.period == -1:
+            self.shutdown_mode = SHUTDOWN_UNTIL_END
+        elif self.period > SHUTDOWN_THRESHOLD:
+            self.shutdown_mode = SHUTDOWN_FOR_DURATION
+        else:
+            self.shutdown_mode = SLEEP_UNTIL_NEXT_CYCLE
+
+    def refresh_active(self) -> None:
+        """
+        Look up the active interval again, once the cached one has ended.
+
+        The device only stays on between cycles when it sleeps, so this is the only case
+        where the active interval can run out while it is in use. If the lookup fails, the
+        current interval is kept and the lookup is retried on the next cycle.
+        """
+        if self.end_epoch is not None and time.time() < self.end_epoch:
+            return
+        logging.info("The active interval ended, looking up the next one")
+        try:
+            self._set_active_config()
+        except Exception as e:
+            logging.warning(f"Keeping the current interval, the next one could not be set: {e}")
+
     @staticmethod
     def validate_config(new_config: Dict[str, Any]) -> None:
         """
@@ -199,9 +294,7 @@ class Config:
         ValueError
             If the UUID is invalid.
         """
-        uuid_pattern = re.compile(
-            r'^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB][0-9A-F]{3}-[0-9A-F]{12}$', re.IGNORECASE)
-        if not uuid_pattern.match(uuid):
+        if not _UUID_PATTERN.match(uuid):
             raise ValueError("Invalid UUID format in the config.")
 
     @staticmethod
@@ -319,6 +412,5 @@ class Config:
         ValueError
             If the time format is invalid.
         """
-        time_pattern = re.compile(r'^(?:[01]\d|2[0-3]):[0-5]\d:[0-5]\d$')
-        if not time_pattern.match(time):
+        if not _TIME_PATTERN.match(time):
             raise ValueError(f"Invalid time format: {time}. Expected format: HH:MM:SS")
@@ -1,14 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 import numpy as np
-from unittest.mock import MagicMock
 try:
     from libcamera import controls
     from picamera2 import Picamera2
 except ImportError:
-    Picamera2 = MagicMock()
-    controls = MagicMock()
+    Picamera2 = None
+    controls = None
 import logging
+from .app_config import ActiveConfig
 
 
 class ICamera(ABC):
@@ -22,25 +22,26 @@ class ICamera(ABC):
 
 
 class Camera(ICamera):
-    def __init__(self, config: dict[str, str]) -> None:
-        self._cam = Picamera2()
+    def __init__(self, config: ActiveConfig) -> None:
+        # Without picamera2 (off the Pi) there is no camera, every capture fails and is reported as such
+        self._cam = Picamera2() if Picamera2 is not None else None
         self._config = config
 
         # Set the premade settings
-        if self._config["quality"] == "4K":
+        if self._config.quality == "4K":
             self._width = 3840
             self._height = 2160
-        elif self._config["quality"] == "3K":
+        elif self._config.quality == "3K":
             self._width = 2560
             self._height = 1440
-        elif self._config["quality"] == "HD":
+        elif self._config.quality == "HD":
             self._width = 1920
             self._height = 1080
         # If the specified quality is not found, default to 3K quality
         else:
             self._width = 2560
             self._height = 1440
-            logging.error(f"Invalid quality specified: {self._config['quality']}. Defaulting to 3K quality.")
+            logging.error(f"Invalid quality specified: {self._config.quality}. Defaulting to 3K quality.")
         logging.info("Camera instance created")
 
     def start(self) -> None:
@@ -55,6 +56,9 @@ class Camera(ICamera):
         ----------
         None
         """
+        if self._cam is None:
+            logging.error("picamera2 is not available, the camera was not started")
+            return
         config = self._cam.create_still_configuration({"size": (self._width, self._height)})
         self._cam.configure(config)
         self._cam.options["quality"] = 95
@@ -71,6 +75,9 @@ class Camera(ICamera):
         ndarray
             The captured image as a numpy array.
         """
+        if self._cam is None:
+            logging.error("picamera2 is not available, no image was captured")
+            return None
         try:
             image = self._cam.capture_array()
             logging.info("Image capture successful!")
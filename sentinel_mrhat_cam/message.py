@@ -2,64 +2,77 @@ from .system import ISystem
 from .rtc import IRTC
 from .camera import ICamera
 from PIL import Image
-from unittest.mock import MagicMock
 import io
-import base64
+try:
+    # SIMD accelerated, falls back to the standard library where it is not installed
+    import pybase64 as base64
+except ImportError:
+    import base64
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 
+# The hardware metrics written to the log, in this order
+_LOGGED_HARDWARE_INFO = (
+    "battery_temperature",
+    "battery_percentage",
+    "cpu_temperature",
+    "battery_voltage_now",
+    "battery_voltage_avg",
+    "battery_current_now",
+    "battery_current_avg",
+    "charger_voltage_now",
+    "charger_current_now",
+)
+
 
 class MessageCreator:
     def __init__(self, camera: ICamera, rtc: IRTC, system: ISystem):
         self._camera = camera
         self._rtc = rtc
         self._system = system
+        # The JPEG of every cycle is written into the same stream, so its memory is allocated only once
+        self._jpeg_buffer: io.BytesIO = io.BytesIO()
 
-    def _create_base64_image(self) -> str:
+    def _create_base64_image(self) -> bytes:
         """
-        Converts a numpy array representing an image into a base64-encoded JPEG string.
-
-        This method is used to transform raw image data, stored as a numpy array.
-        The image data is first converted into a PIL Image object,
-        then encoded into JPEG format, and finally converted into a base64 string
-        for transmission.
+        Captures an image and converts it into base64-encoded JPEG bytes.
 
-        Parameters
-        ----------
-        image_array : numpy.ndarray
-            The image data as a numpy array.
+        The numpy array returned by the camera is first converted into a PIL Image object,
+        then encoded into JPEG format, and finally base64-encoded for transmission.
 
         Returns
         -------
-        str
-            The base64-encoded string representation of the JPEG image. This string
+        bytes
+            The base64-encoded representation of the JPEG image as ASCII bytes. These
             can be used in the JSON message, which requires text-based image encoding.
 
         Raises
         ------
         ValueError
-            If the input image_array is not in a valid format that can be converted
+            If the captured image is not in a valid format that can be converted
             into a JPEG image.
 
         Notes
         -----
-        - If the provided image array is `None`, then there was an error with the camera during the
+        - If the captured image array is `None`, then there was an error with the camera during the
         image capture process. Since the connection to the MQTT broker is not established yet,
         the image capturing function will provide `None` as the return value.
         This way we can log the error through MQTT when it connects.
         """
         # Get picture from camera
         image_array = self._camera.capture()
-        if image_array is None or isinstance(image_array, MagicMock):
-            return "Error: Camera was unable to capture the image."
+        if image_array is None:
+            return b"Error: Camera was unable to capture the image."
 
         image: Image.Image = Image.fromarray(image_array)
-        image_bytes: io.BytesIO = io.BytesIO()
+        image_bytes: io.BytesIO = self._jpeg_buffer
+        image_bytes.seek(0)
         image.save(image_bytes, format="JPEG")
-        image_data: bytes = image_bytes.getvalue()
+        # Drop the end of a larger previous image, the stream is reused so only the new JPEG is encoded
+        image_bytes.truncate()
 
-        return base64.b64encode(image_data).decode("utf-8")
+        return base64.b64encode(image_bytes.getvalue())
 
     def _log_hardware_info(self, hardware_info: Dict[str, Any]) -> None:
         """
@@ -76,34 +89,22 @@ class MessageCreator:
         with open("hardware_log.txt", "a") as log_file:
             log_file.write(f"{log_entry}\n")
 
-        logging.info(f"battery_temperature: {hardware_info['battery_temperature']}")
-        logging.info(f"battery_percentage: {hardware_info['battery_percentage']}")
-        logging.info(f"cpu_temperature: {hardware_info['cpu_temperature']}")
+        # One record per sample instead of one per metric, only built when it is logged
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info(", ".join(f"{key}: {hardware_info[key]}" for key in _LOGGED_HARDWARE_INFO))
 
-        logging.info(f"battery_voltage_now: {hardware_info['battery_voltage_now']}")
-        logging.info(f"battery_voltage_avg: {hardware_info['battery_voltage_avg']}")
-        logging.info(f"battery_current_now: {hardware_info['battery_current_now']}")
-        logging.info(f"battery_current_avg: {hardware_info['battery_current_avg']}")
-        logging.info(f"charger_voltage_now: {hardware_info['charger_voltage_now']}")
-        logging.info(f"charger_current_now: {hardware_info['charger_current_now']}")
-
-    def create_message(self) -> str:
+    def create_message(self) -> Optional[bytes]:
         """
         Creates a JSON message containing image data, timestamp, CPU temperature,
         battery temperature, and battery charge percentage.
 
-        Parameters
-        ----------
-        image_array : numpy.ndarray
-            The image data as a numpy array. This data is converted into a base64-encoded
-            JPEG string before being included in the JSON message.
-        timestamp : str
-            The timestamp in ISO 8601 format.
+        The image is captured and base64-encoded, and the timestamp is read from the RTC.
+        The message is built directly as bytes, with the image as its first field.
 
         Returns
         -------
-        str
-            The whole JSON message as a string.
+        bytes or None
+            The whole JSON message encoded as UTF-8, or None if the current time could not be read.
 
         Raises
         ------
@@ -119,11 +120,13 @@ class MessageCreator:
         try:
             hardware_info = self._system.get_hardware_info()
             timestamp = self._rtc.get_time()
+            if timestamp is None:
+                logging.error("Unable to read the current time, the message was not created")
+                return None
             image = self._create_base64_image()
 
             message: Dict[str, Any] = {
                 "timestamp": timestamp,
-                "image": image,
                 "cpuTemp": hardware_info["cpu_temperature"],
                 "batteryTemp": hardware_info["battery_temperature"],
                 "batteryCharge": hardware_info["battery_percentage"],
@@ -133,7 +136,12 @@ class MessageCreator:
             if hardware_info:
                 self._log_hardware_info(hardware_info)
 
-            return json.dumps(message)
+            # The base64 image is plain ASCII and needs no escaping, so it is spliced into the JSON
+            # instead of being scanned by json.dumps and copied again when published.
+            # The image must stay the first field, tests/manual_tests/mqtt_subscribe.py relies on
+            # the '{"image": "' prefix (IMAGE_PREFIX) to split it from the message
+            fields = json.dumps(message).encode("utf-8")
+            return b"".join((b'{"image": "', image, b'", ', fields[1:]))
 
         except Exception as e:
             logging.error(f"Problem creating the message: {e}")
@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 import logging
 import time
 import shutil
-from typing import Any
+from typing import Any, Union
 import json
 import socket
 import threading
@@ -28,7 +28,7 @@ class ICommunication(ABC):
         pass
 
     @abstractmethod
-    def send(self, message: str, topic: str) -> None:
+    def send(self, message: Union[str, bytes], topic: str) -> None:
         pass
 
     @abstractmethod
@@ -43,6 +43,10 @@ class ICommunication(ABC):
     def wait_for_config(self) -> bool:
         pass
 
+    @abstractmethod
+    def wait_for_config_update(self, timeout: float) -> bool:
+        pass
+
 
 class MQTT(ICommunication):
     """
@@ -67,6 +71,8 @@ class MQTT(ICommunication):
         The MQTT client instance.
     config_received_event : threading.Event
         An event to signal when a new configuration is received.
+    config_updated_event : threading.Event
+        An event to signal when a new configuration is saved outside of the config check.
     config_confirm_message : str
         A message to confirm the receipt of a new configuration.
 
@@ -86,6 +92,7 @@ class MQTT(ICommunication):
         self.client = mqtt_client.Client(mqtt_enums.CallbackAPIVersion.VERSION2)
         self.config_confirm_message: str = "config-nok|Confirm message uninitialized"
         self.config_received_event: threading.Event = threading.Event()
+        self.config_updated_event: threading.Event = threading.Event()
         self.new_config: bool = True
 
     def _broker_check(self) -> None:
@@ -161,8 +168,9 @@ class MQTT(ICommunication):
             Exits the script if an unexpected error occurs during the connection attempt.
         """
         try:
-            socket.create_connection((BROKER, PORT), timeout=5)
-            return True
+            # The probe socket is closed right away, paho opens its own connection
+            with socket.create_connection((BROKER, PORT), timeout=5):
+                return True
         except OSError:
             return False
         except Exception as e:
@@ -174,6 +182,7 @@ class MQTT(ICommunication):
         Initializes the MQTT client to receive the config file.
 
         This function sets up the MQTT client's `on_message` callback to handle the incoming config.
+        The config topic itself is subscribed to in `connect`, and again in `on_connect` after a reconnect.
         When a config is received, it attempts to parse it as a JSON, validate it,
         and save it to a temporary file. If successful, the configuration is copied to the final
         configuration path, and a confirmation message is set. If an error occurs, an appropriate
@@ -204,6 +213,7 @@ class MQTT(ICommunication):
                 print(f"Config saved to {CONFIG_PATH}")
                 self.config_confirm_message = "config-ok"
                 self.new_config = True
+                self.config_updated_event.set()
 
             except json.JSONDecodeError as e:
                 self.config_confirm_message = f"config-nok|Invalid JSON received: {e}"
@@ -215,25 +225,22 @@ class MQTT(ICommunication):
                 self.config_received_event.set()
 
         self.client.on_message = on_message
-        self.client.subscribe(self._subtopic)
-        logging.info(f"Subscribed to topic: {self._subtopic}")
 
     def is_connected(self) -> bool:
         return self.client.is_connected()
 
-    def send(self, message: str, topic: str) -> None:
+    def send(self, message: Union[str, bytes], topic: str) -> None:
         """
         Publishes a message to a specified MQTT topic.
 
         This method sends a message to the MQTT broker to be published on a specified topic.
-        It uses the MQTT client to publish the message with QoS = 2.
-        The method waits for the message (max 5 seconds) to be published and handles any errors that might occur during
-        the publishing process.
+        It uses the MQTT client to publish the message with the configured QoS.
+        The publish is not awaited, the message is delivered by the network loop thread.
 
         Parameters:
         ----------
-        message : str
-            The payload to be published to the MQTT topic.
+        message : str or bytes
+            The payload to be published to the MQTT topic. Bytes are published as they are.
 
         topic : str
             The topic string to which the message should be published.
@@ -243,9 +250,6 @@ class MQTT(ICommunication):
         client.publish(topic, message, qos) -> MQTTMessageInfo:
             Sends a message to the broker on the specified topic.
 
-        msg_info.wait_for_publish(timeout) -> None:
-            Blocks until the message publishing is acknowledged or the 5 second time limit is met.
-
         Raises:
         -------
         SystemExit:
@@ -253,7 +257,6 @@ class MQTT(ICommunication):
         """
         try:
             self.client.publish(topic, message, qos=self._qos)
-            # msg_info.wait_for_publish(timeout=5)
         except Exception:
             print("Failed to publish")
             exit(1)
@@ -274,6 +277,9 @@ class MQTT(ICommunication):
             def on_connect(client: Any, userdata: Any, flags: Any, reason_code: Any, properties: Any) -> None:
                 if reason_code == 0:
                     logging.info("Connected to MQTT Broker!")
+                    # The session is not persistent, so the subscription is renewed on every
+                    # (re)connect, otherwise the config replies stop arriving after a reconnect
+                    client.subscribe(self._subtopic)
                 else:
                     logging.error(f"Failed to connect, return code {reason_code}")
 
@@ -284,8 +290,12 @@ class MQTT(ICommunication):
             self.client.disable_logger()
 
             self.client.connect(self._broker, self._port)
+            # Subscribing before the loop starts, so the SUBSCRIBE is written before any publish
+            # and the config reply to the uuid cannot reach the broker ahead of the subscription
+            self.client.subscribe(self._subtopic)
+            logging.info("Subscribed to topic: %s", self._subtopic)
             # Resetting the counter after a successful connection
-            self.broker_connect_counter = 0
+            self._broker_connect_counter = 0
             self._init_receive()
             self.client.loop_start()
 
@@ -315,6 +325,29 @@ class MQTT(ICommunication):
             self.config_confirm_message = "config-nok | Timed out waiting for config"
             self.new_config = False
 
-        logging.info(f"config_confirm_message: {self.config_confirm_message}")
+        # The caller loads the received config, so it no longer counts as an update
+        self.config_updated_event.clear()
+        logging.info("config_confirm_message: %s", self.config_confirm_message)
         self.send(self.config_confirm_message, CONFIGACK_TOPIC)
         return self.new_config
+
+    def wait_for_config_update(self, timeout: float) -> bool:
+        """
+        Wait until a new config is received or the timeout expires.
+
+        The MQTT network loop keeps running in its own thread while waiting, so the
+        connection stays alive and the wait ends as soon as `on_message` saves a new config.
+
+        Parameters
+        ----------
+        timeout : float
+            The maximum time to wait in seconds.
+
+        Returns
+        -------
+        bool
+            True if a new config was received during the wait, False if the timeout expired.
+        """
+        updated = self.config_updated_event.wait(timeout)
+        self.config_updated_event.clear()
+        return updated
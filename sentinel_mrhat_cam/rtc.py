@@ -1,22 +1,25 @@
-from datetime import datetime
-import pytz
+from datetime import datetime, time as dtime, timezone
+import functools
 import logging
 import re
 import time
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 import subprocess
 
+# Matches the HH:MM:SS time in a timedatectl line
+_TIME_PATTERN = re.compile(r'(\d{2}):(\d{2}):(\d{2})')
+
 
 class IRTC(ABC):
     @staticmethod
     @abstractmethod
-    def get_time() -> str:
+    def get_time() -> Optional[str]:
         pass
 
     @staticmethod
     @abstractmethod
-    def localize_time(time: str) -> str:
+    def to_epoch(time: str) -> int:
         pass
 
 
@@ -29,7 +32,7 @@ class RTC(IRTC):
 
     """
     @staticmethod
-    def _extract_time(lines: List[str], target_string: str) -> datetime:
+    def _extract_time(lines: List[str], target_string: str) -> int:
         """
         Extract the time in HH:MM:SS format from the line containing the target string.
 
@@ -42,8 +45,8 @@ class RTC(IRTC):
 
         Returns
         -------
-        str
-            The extracted time in HH:MM:SS format.
+        int
+            The extracted time as the number of seconds since midnight.
 
         Raises
         ------
@@ -51,17 +54,32 @@ class RTC(IRTC):
             If the time cannot be extracted from the line.
         """
         line = RTC._find_line(lines, target_string)
-        # Define a regex pattern to match the time format HH:MM:SS
-        pattern = r'(\d{2}:\d{2}:\d{2})'
-        match = re.search(pattern, line)
+        match = _TIME_PATTERN.search(line)
         if match:
-            time = match.group(1)
-            return datetime.strptime(time, "%H:%M:%S")
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
         else:
             raise Exception(f"Unable to extract time from line: {line}")
 
     @staticmethod
-    def _find_line(lines: list[str], target_string: str) -> str:
+    def _format_time(seconds: int) -> str:
+        """
+        Format the number of seconds since midnight as an HH:MM:SS string.
+
+        Parameters
+        ----------
+        seconds : int
+            Seconds since midnight, as returned by `_extract_time`.
+
+        Returns
+        -------
+        str
+            The time in HH:MM:SS format.
+        """
+        return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+    @staticmethod
+    def _find_line(lines: List[str], target_string: str) -> str:
         """
         Find and return a specific line from `timedatectl` output.
 
@@ -143,11 +161,8 @@ class RTC(IRTC):
         - This operation is typically used to ensure the RTC maintains accurate time
         even when the system is powered off.
         """
-        try:
-            subprocess.run(['sudo', 'hwclock', '--systohc'], check=True)
-            logging.info("RTC synced to system clock")
-        except subprocess.CalledProcessError:
-            raise
+        subprocess.run(['sudo', 'hwclock', '--systohc'], check=True)
+        logging.info("RTC synced to system clock")
 
     @staticmethod
     def _sync_system_to_ntp(max_retries: int = 5, delay: int = 2) -> bool:
@@ -171,16 +186,11 @@ class RTC(IRTC):
         bool
             True if synchronization is successful, False otherwise.
 
-        Raises
-        ------
-        SystemExit
-            If synchronization fails after the maximum number of retries.
-
         Notes
         -----
         - The method uses exponential backoff for retry delays.
         - It logs a warning message for each failed attempt.
-        - If all retries fail, it logs an error message and exits the program.
+        - If all retries fail, it logs an error message and returns False.
         """
         for retry in range(max_retries):
             lines = RTC._get_timedatectl()
@@ -192,21 +202,50 @@ class RTC(IRTC):
             time.sleep(delay)
             delay *= 2
         logging.error("Failed to sync system to NTP after maximum retries")
-        exit(1)
+        return False
 
     @staticmethod
-    def localize_time(time: str) -> str:
-        # Get the current date and attach the input time to it to account for daylight saving time
-        today = datetime.now(pytz.utc).date()
-        utc_time = datetime.strptime(time, "%H:%M:%S").replace(
-            tzinfo=pytz.utc).replace(year=today.year, month=today.month, day=today.day)
-        budapest_tz = pytz.timezone('Europe/Budapest')
-        # Convert the UTC time to Budapest time
-        local_time = utc_time.astimezone(budapest_tz)
-        return local_time.strftime("%H:%M:%S")
+    @functools.lru_cache(maxsize=32)
+    def parse_time(time: str) -> dtime:
+        """
+        Parse a time in HH:MM:SS format.
+
+        The results are cached, since only the few start and end times of the timing table are
+        parsed, again on every config load.
+
+        Parameters
+        ----------
+        time : str
+            The time in HH:MM:SS format.
+
+        Returns
+        -------
+        datetime.time
+            The parsed time of day.
+        """
+        return datetime.strptime(time, "%H:%M:%S").time()
+
+    @staticmethod
+    def to_epoch(time: str) -> int:
+        """
+        Convert a UTC time of today into seconds since the Unix epoch.
+
+        Parameters
+        ----------
+        time : str
+            The UTC time in HH:MM:SS format.
+
+        Returns
+        -------
+        int
+            The Unix timestamp of the given time on the current UTC date.
+        """
+        today = datetime.now(timezone.utc).date()
+        utc_time = datetime.combine(today, RTC.parse_time(time), tzinfo=timezone.utc)
+        return int(utc_time.timestamp())
 
     @staticmethod
-    def get_time() -> str:
+    def get_time() -> Optional[str]:
         """
         Get the current time, ensuring synchronization with NTP and RTC.
 
@@ -216,41 +255,41 @@ class RTC(IRTC):
 
         Returns
         -------
-        str
-            The current time in ISO 8601 format.
-
-        Raises
-        ------
-        Exception
-            If unable to read the system time or perform necessary operations.
+        str or None
+            The current time in ISO 8601 format, or None if the time could not be read
+            or synchronized.
 
         Notes
         -----
         - The method compares RTC time with system time and syncs if they differ by more than 2 seconds.
         - It uses NTP synchronization and updates the RTC if significant time difference is detected.
+        - Errors are logged and reported through the None return value, the caller decides
+          whether to retry.
         """
         try:
             logging.info("Attempting to get time from RTC")
             # Get all the lines from timedatectl output
             lines = RTC._get_timedatectl()
-            logging.debug(f"timedatectl output: {lines}")
+            logging.debug("timedatectl output: %s", lines)
 
             rtc = RTC._extract_time(lines, "RTC time:")
             utc = RTC._extract_time(lines, "Universal time:")
-            logging.info(f"RTC time: {rtc.strftime('%H:%M:%S')}, UTC time: {utc.strftime('%H:%M:%S')}")
+            if logging.getLogger().isEnabledFor(logging.INFO):
+                logging.info("RTC time: %s, UTC time: %s", RTC._format_time(rtc), RTC._format_time(utc))
 
             # If the RTC time is different from the system clock sync them
-            if abs((utc - rtc).total_seconds()) > 2:
-                RTC._sync_system_to_ntp()
+            if abs(utc - rtc) > 2:
+                if not RTC._sync_system_to_ntp():
+                    return None
                 RTC._sync_RTC_to_system()
                 # ask for the time again
                 lines = RTC._get_timedatectl()
                 utc = RTC._extract_time(lines, "Universal time:")
 
-            time_str = str(utc.strftime("%H:%M:%S"))
-            logging.info(f"Time now: {time_str}")
-            return str(utc.strftime("%H:%M:%S"))
+            time_str = RTC._format_time(utc)
+            logging.info("Time now: %s", time_str)
+            return time_str
 
         except Exception as e:
             logging.error(f"Error reading system time: {e}")
-            exit(1)
+            return None
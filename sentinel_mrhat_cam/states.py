@@ -1,30 +1,33 @@
-from abc import ABC, abstractmethod
 import time
 import logging
-from functools import wraps
-from typing import Any, TypeVar, Callable, cast, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union, Optional, Dict, Callable
 from .camera import ICamera, Camera
 from .mqtt import ICommunication, MQTT
 from .system import ISystem, System
 from .rtc import IRTC, RTC
-from .app_config import Config
+from .app_config import Config, SHUTDOWN_UNTIL_END, SHUTDOWN_FOR_DURATION, SLEEP_UNTIL_NEXT_CYCLE
 from .message import MessageCreator
 from .logger import Logger
-from .static_config import UUID_TOPIC, IMAGE_TOPIC, SHUTDOWN_THRESHOLD, TIME_TO_BOOT_AND_SHUTDOWN
-F = TypeVar('F', bound=Callable[..., Any])
+from .static_config import (
+    UUID_TOPIC, IMAGE_TOPIC, SHUTDOWN_THRESHOLD, TIME_TO_BOOT_AND_SHUTDOWN, RETRY_WAIT_TIME, MAX_RETRY_COUNT
+)
 
 
-class State(ABC):
-    @abstractmethod
+class State:
+    # Whether the time spent in the state counts towards the runtime of the current cycle
+    timed: bool = True
+
     def handle(self, app: 'Context') -> None:
-        pass
+        # Subclasses implement the state, a plain base class keeps the ABC machinery out of the dispatch
+        raise NotImplementedError
 
 
 class Context:
     runtime: float = 0.0  # static varibale to measure the accumulated runtime of the application
 
     def __init__(self, logger: Logger):
-        self._state: State = InitState()
+        self._state: State = _INIT_STATE
         self.communication: ICommunication = MQTT()
         self.config: Config = Config(self.communication)
         self.camera: ICamera = Camera(self.config.active)
@@ -32,128 +35,166 @@ class Context:
         self.rtc: IRTC = RTC()
         self.message_creator: MessageCreator = MessageCreator(self.camera, self.rtc, self.system)
         self.logger = logger
-        self.message: str = "Uninitialized message"
+        self.message: Optional[bytes] = b"Uninitialized message"
+        self.retry_count: int = 0
 
     def request(self) -> None:
-        self._state.handle(self)
-
-    def set_state(self, state: State) -> None:
-        self._state = state
-
-    @staticmethod
-    def reset_runtime() -> None:
-        Context.runtime = 0.0
-
-    @staticmethod
-    def log_and_save_execution_time(function_name: str) -> Callable[[F], F]:
         """
-        Saves the execution time of the function to the `runtime` variable.
+        Handles the current state, saving its execution time to the `runtime` variable.
 
-        Args:
-            function_name (Optional[str], optional): Operation description. Defaults to None.
-
-        Returns:
-            Callable[[F], F]: Wrapped function with logging.
+        States that only wait, like `IdleState`, are not timed.
         """
-        def decorator(func: F) -> F:
-            @wraps(func)
-            def wrapper(*args: Any, **kwargs: Any) -> Any:
-                start_time = time.perf_counter()
-                result = func(*args, **kwargs)
-                end_time = time.perf_counter()
-                execution_time = end_time - start_time
-                log_message = f"{function_name} took {execution_time:.6f} seconds"
+        state = self._state
+        if not state.timed:
+            state.handle(self)
+            return
 
-                # Update the class-level runtime
-                Context.runtime += execution_time
-                logging.info(log_message)
+        start_time = time.perf_counter_ns()
+        state.handle(self)
+        execution_time = (time.perf_counter_ns() - start_time) * 1e-9
 
-                return result
+        # Update the class-level runtime
+        Context.runtime += execution_time
+        logging.info("%s took %.6f seconds", type(state).__name__, execution_time)
 
-            return cast(F, wrapper)
+    def set_state(self, state: State) -> None:
+        self._state = state
 
-        return decorator
+    @staticmethod
+    def reset_runtime() -> None:
+        Context.runtime = 0.0
 
 
 class InitState(State):
-    @Context.log_and_save_execution_time(function_name="InitState")
     def handle(self, app: Context) -> None:
-        logging.info("In InitState")
-        app.camera.start()
-        app.set_state(CreateMessageState())
+        logging.debug("In InitState")
+        # Connecting to the broker does not depend on the camera, so the two are done in parallel.
+        # The connection is kept open across cycles, it is only closed before shutting down
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            connecting = executor.submit(app.communication.connect)
+            app.camera.start()
+            # Re-raises any error of the connection, including the SystemExit of a failed connect
+            connecting.result()
+        app.logger.start_remote_logging(app.communication)
+        app.set_state(_CREATE_MESSAGE_STATE)
 
 
 class CreateMessageState(State):
-    @Context.log_and_save_execution_time(function_name="CreateMessageState")
     def handle(self, app: Context) -> None:
-        logging.info("In CreateMessageState")
+        logging.debug("In CreateMessageState")
+        # Send the current config uuid first, so the broker round trip of the config reply
+        # overlaps the capture. It keeps the configured QoS, so paho queues and resends it
+        # if the connection drops, instead of losing it and waiting out the config timeout
+        app.communication.clear_config_received()
+        app.communication.send(app.config.active.uuid, UUID_TOPIC)
         app.message = app.message_creator.create_message()
-        logging.info("After creating message")
+        if app.message is None:
+            app.set_state(_RETRY_STATE)
+            return
+        app.retry_count = 0
+        logging.debug("After creating message")
+        app.set_state(_CONFIG_CHECK_STATE)
+
+
+class RetryState(State):
+    timed = False
 
-        # Connect to the remote server if not connected already
-        if not app.communication.is_connected():
-            app.communication.connect()
-            app.logger.start_remote_logging(app.communication)
+    def handle(self, app: Context) -> None:
+        logging.debug("In RetryState")
+        app.retry_count += 1
+        if app.retry_count > MAX_RETRY_COUNT:
+            logging.error(f"Creating the message failed {MAX_RETRY_COUNT} times, restarting script...")
+            exit(1)
 
-        app.set_state(ConfigCheckState())
+        logging.warning("Retrying message creation in %s seconds (%s/%s)",
+                        RETRY_WAIT_TIME, app.retry_count, MAX_RETRY_COUNT)
+        time.sleep(RETRY_WAIT_TIME)
+        app.set_state(_CREATE_MESSAGE_STATE)
 
 
 class ConfigCheckState(State):
-    @Context.log_and_save_execution_time(function_name="ConfigCheckState")
     def handle(self, app: Context) -> None:
-        logging.info("In ConfigCheckState")
-        # Send the current config uuid
-        app.communication.clear_config_received()
-        app.communication.send(app.config.active["uuid"], UUID_TOPIC)
+        logging.debug("In ConfigCheckState")
+        # The uuid was sent before the capture, the reply has usually arrived by now
         # If new config is received load it
         if app.communication.wait_for_config() is True:
             app.config.load()
 
-        app.set_state(TransmitState())
+        app.set_state(_TRANSMIT_STATE)
 
 
 class TransmitState(State):
-    @Context.log_and_save_execution_time(function_name="TransmitState")
     def handle(self, app: Context) -> None:
-        logging.info("In TransmitState")
+        logging.debug("In TransmitState")
         app.communication.send(app.message, IMAGE_TOPIC)
-        app.set_state(IdleState())
+        app.set_state(_IDLE_STATE)
 
 
-class IdleState (State):
+class IdleState(State):
+    timed = False
+
     def handle(self, app: Context) -> None:
-        logging.info("In IdleState")
+        logging.debug("In IdleState")
 
-        period: int = app.config.active["period"]  # period of the message sending
+        period: int = app.config.period  # period of the message sending
         waiting_time: float = max(period - app.runtime, 0)  # time to wait in between the new message creation
         if waiting_time == 0:
             logging.warning("The current period is too fast")
 
-        logging.info(f"period: {period}")
-        logging.info(f"waiting time: {waiting_time}")
-        logging.info(f"run time: {app.runtime}")
-
-        self._schedule_next_cycle(app, period, waiting_time)
-
-    def _schedule_next_cycle(self, app: Context, period: int, waiting_time: float) -> None:
-        if period == -1:
-            local_wake_time = app.rtc.localize_time(app.config.active["end"])
-            logging.info("Pi shutting down")
-            self._shutdown(app, local_wake_time)
-
-        elif waiting_time > SHUTDOWN_THRESHOLD:
-            shutdown_duration = max(waiting_time - TIME_TO_BOOT_AND_SHUTDOWN, 0)
-            logging.info("Pi shutting down")
-            self._shutdown(app, shutdown_duration)
-
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("period: %s", period)
+            logging.info("waiting time: %s", waiting_time)
+            logging.info("run time: %s", app.runtime)
+
+        self._schedule_next_cycle(app, waiting_time)
+
+    def _schedule_next_cycle(self, app: Context, waiting_time: float) -> None:
+        # The kind of wait only changes when the config is loaded, so it is looked up instead of recomputed
+        IdleState._SCHEDULERS[app.config.shutdown_mode](self, app, waiting_time)
+
+    def _shutdown_until_end(self, app: Context, waiting_time: float) -> None:
+        logging.info("Pi shutting down")
+        # The end of the interval is known from the config, only the seconds left are computed
+        self._shutdown(app, max(app.config.end_epoch - int(time.time()), 0))
+
+    def _shutdown_for_duration(self, app: Context, waiting_time: float) -> None:
+        # A long period can still leave a short wait, if the cycle took long enough
+        if waiting_time <= SHUTDOWN_THRESHOLD:
+            self._sleep(app, waiting_time)
+            return
+
+        shutdown_duration = max(waiting_time - TIME_TO_BOOT_AND_SHUTDOWN, 0)
+        logging.info("Pi shutting down")
+        self._shutdown(app, shutdown_duration)
+
+    def _sleep(self, app: Context, waiting_time: float) -> None:
+        logging.info("sleeping for %s seconds", waiting_time)
+        # Wake up early if a new config arrives while waiting
+        if app.communication.wait_for_config_update(waiting_time):
+            logging.info("New config received while waiting")
+            app.config.load()
         else:
-            logging.info(f"sleeping for {waiting_time} seconds")
-            time.sleep(waiting_time)
-            app.reset_runtime()
-            app.set_state(CreateMessageState())
+            app.config.refresh_active()
+        app.reset_runtime()
+        app.set_state(_CREATE_MESSAGE_STATE)
 
     def _shutdown(self, app: Context, wake_time: Union[str, int, float]) -> None:
-        logging.info(f"Wake time is: {wake_time}")
+        logging.info("Wake time is: %s", wake_time)
         app.logger.stop_remote_logging()
         app.communication.disconnect()
         app.system.schedule_wakeup(wake_time)
+
+    _SCHEDULERS: Dict[str, Callable[['IdleState', Context, float], None]] = {
+        SHUTDOWN_UNTIL_END: _shutdown_until_end,
+        SHUTDOWN_FOR_DURATION: _shutdown_for_duration,
+        SLEEP_UNTIL_NEXT_CYCLE: _sleep,
+    }
+
+
+# The states hold no data of their own, so a single instance of each is shared by every transition
+_INIT_STATE = InitState()
+_CREATE_MESSAGE_STATE = CreateMessageState()
+_RETRY_STATE = RetryState()
+_CONFIG_CHECK_STATE = ConfigCheckState()
+_TRANSMIT_STATE = TransmitState()
+_IDLE_STATE = IdleState()
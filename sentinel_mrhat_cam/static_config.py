@@ -1,29 +1,26 @@
 import os
 import logging
+from typing import Final
 
 # Configuration file paths
-CONFIG_DIR = '/home/admin/config'
-LOG_CONFIG_PATH = os.path.join(CONFIG_DIR, 'sentinel_log_config.yaml')
-CONFIG_PATH = os.path.join(CONFIG_DIR, 'sentinel_app_config.json')
-TEMP_CONFIG_PATH = os.path.join(CONFIG_DIR, 'temp_config.json')
+CONFIG_DIR: Final[str] = '/home/admin/config'
+LOG_CONFIG_PATH: Final[str] = os.path.join(CONFIG_DIR, 'sentinel_log_config.yaml')
+CONFIG_PATH: Final[str] = os.path.join(CONFIG_DIR, 'sentinel_app_config.json')
+TEMP_CONFIG_PATH: Final[str] = os.path.join(CONFIG_DIR, 'temp_config.json')
 
 # MQTT Configuration
-BROKER = "192.168.0.232"
-PORT = 1883
-QOS = 2
-USERNAME = "er-edge"
-PASSWORD = "admin"
-IMAGE_TOPIC = "sentinel/cam1"
-CONFIGACK_TOPIC = "er-edge/confirm"
-CONFIGSUB_TOPIC = "config/er-edge"
-LOGGING_TOPIC = "cam4/log"
-UUID_TOPIC = "cam4/uuid"
-LOG_LEVEL = logging.INFO
-MAX_WAIT_TIME_FOR_CONFG = 60
-
-# App configuration
-SHUTDOWN_THRESHOLD = 40
-TIME_TO_BOOT_AND_SHUTDOWN = 20
+BROKER: Final[str] = "192.168.0.232"
+PORT: Final[int] = 1883
+QOS: Final[int] = 2
+USERNAME: Final[str] = "er-edge"
+PASSWORD: Final[str] = "admin"
+IMAGE_TOPIC: Final[str] = "sentinel/cam1"
+CONFIGACK_TOPIC: Final[str] = "er-edge/confirm"
+CONFIGSUB_TOPIC: Final[str] = "config/er-edge"
+LOGGING_TOPIC: Final[str] = "cam4/log"
+UUID_TOPIC: Final[str] = "cam4/uuid"
+LOG_LEVEL: Final[int] = logging.INFO
+MAX_WAIT_TIME_FOR_CONFG: Final[int] = 60
 
 # App configuration
 """
@@ -33,19 +30,36 @@ if  `period` < **SHUTDOWN_THRESHOLD** :
 if  `period` > **SHUTDOWN_THRESHOLD** :
     The device shuts down in between picture taking.
 """
-SHUTDOWN_THRESHOLD = 40
+SHUTDOWN_THRESHOLD: Final[int] = 40
 
 """
 This is the default time in seconds that, the he Pi takes to shutdown, and then to boot again.
 """
-TIME_TO_BOOT_AND_SHUTDOWN = 20
+TIME_TO_BOOT_AND_SHUTDOWN: Final[int] = 20
 
 """
 This is the minimum value for `period` in seconds.
 """
-MINIMUM_WAIT_TIME = 5
+MINIMUM_WAIT_TIME: Final[int] = 5
 
 """
 This is the maximum value for `period` in seconds.
 """
-MAXIMUM_WAIT_TIME = 3600
+MAXIMUM_WAIT_TIME: Final[int] = 3600
+
+"""
+This is the time in seconds to wait before retrying a failed message creation.
+"""
+RETRY_WAIT_TIME: Final[int] = 5
+
+"""
+This is the number of consecutive failed message creations before the script exits.
+"""
+MAX_RETRY_COUNT: Final[int] = 3
+
+"""
+These are the shortest and longest times in seconds for which the charger is not read
+after its device was not found. The time doubles on every miss.
+"""
+CHARGER_BACKOFF_MIN: Final[float] = 60.0
+CHARGER_BACKOFF_MAX: Final[float] = 600.0
@@ -2,11 +2,23 @@ from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, Union
 import subprocess
 import logging
-from datetime import datetime
-try:
-    from gpiozero import CPUTemperature
-except ImportError:
-    CPUTemperature = None
+import os
+import time
+from datetime import datetime, timedelta
+from .static_config import CHARGER_BACKOFF_MIN, CHARGER_BACKOFF_MAX
+
+_BATTERY_UEVENT_PATH = '/sys/class/power_supply/bq2562x-battery/uevent'
+_CHARGER_UEVENT_PATH = '/sys/class/power_supply/bq2562x-charger/uevent'
+_CPU_TEMPERATURE_PATH = '/sys/class/thermal/thermal_zone0/temp'
+# The uevent readings reported in µV and µA, with the uevent they come from, converted to V and A
+_MICRO_UNIT_READINGS = (
+    ("battery_voltage_now", "battery", "POWER_SUPPLY_VOLTAGE_NOW"),
+    ("battery_voltage_avg", "battery", "POWER_SUPPLY_VOLTAGE_AVG"),
+    ("battery_current_now", "battery", "POWER_SUPPLY_CURRENT_NOW"),
+    ("battery_current_avg", "battery", "POWER_SUPPLY_CURRENT_AVG"),
+    ("charger_voltage_now", "charger", "POWER_SUPPLY_VOLTAGE_NOW"),
+    ("charger_current_now", "charger", "POWER_SUPPLY_CURRENT_NOW"),
+)
 
 
 class ISystem(ABC):
@@ -22,42 +34,57 @@ class ISystem(ABC):
 
 
 class System(ISystem):
+    # The monotonic time until which the missing charger is not read, and the next wait
+    _charger_retry_time: float = 0.0
+    _charger_backoff: float = CHARGER_BACKOFF_MIN
+
+    @staticmethod
+    def _read_uevent(path: str) -> Dict[str, Any]:
+        # sysfs files are read in-process, spawning cat for them costs a fork and exec per file
+        with open(path, 'r') as uevent:
+            content = uevent.read()
+
+        # Lines without a KEY=VALUE pair are skipped, values may contain '=' themselves
+        data: Dict[str, Any] = {}
+        for line in content.splitlines():
+            key, separator, value = line.partition("=")
+            if separator:
+                data[key] = value
+        return data
+
     @staticmethod
     def _get_battery_info() -> Dict[str, Any]:
-        battery_result = subprocess.run(
-            ['cat', '/sys/class/power_supply/bq2562x-battery/uevent'], stdout=subprocess.PIPE, check=True
-        )
-        battery_info = battery_result.stdout.decode('utf-8')
-        battery_data = dict(line.split("=") for line in battery_info.strip().split("\n"))
-
-        result = subprocess.run(
-            ['upower', '-i', '/org/freedesktop/UPower/devices/battery_bq2562x_battery'],
-            stdout=subprocess.PIPE,
-            check=True,
-        )
-        info = result.stdout.decode('utf-8')
-
-        for line in info.splitlines():
-            if "temperature:" in line:
-                battery_data['battery_temperature'] = float(line.split(":")[1].strip().split()[0])
+        battery_data = System._read_uevent(_BATTERY_UEVENT_PATH)
+
+        # The uevent already holds the temperature upower reports, in tenths of a degree Celsius
+        if "POWER_SUPPLY_TEMP" in battery_data:
+            battery_data['battery_temperature'] = int(battery_data["POWER_SUPPLY_TEMP"]) / 10
 
         return battery_data
 
     @staticmethod
     def _get_charger_info() -> Dict[str, Any]:
-        charger_result = subprocess.run(
-            ['cat', '/sys/class/power_supply/bq2562x-charger/uevent'], stdout=subprocess.PIPE, check=True
-        )
-        charger_info = charger_result.stdout.decode('utf-8')
-
-        charger_data = dict(line.split("=") for line in charger_info.strip().split("\n"))
+        now = time.monotonic()
+        if now < System._charger_retry_time:
+            return {}
 
+        try:
+            charger_data = System._read_uevent(_CHARGER_UEVENT_PATH)
+        except FileNotFoundError:
+            # Without a charger device the readings default to 0, it is looked for again later
+            logging.warning("Charger not found, not reading it for %s seconds", System._charger_backoff)
+            System._charger_retry_time = now + System._charger_backoff
+            System._charger_backoff = min(System._charger_backoff * 2, CHARGER_BACKOFF_MAX)
+            return {}
+
+        System._charger_backoff = CHARGER_BACKOFF_MIN
         return charger_data
 
     @staticmethod
     def _get_cpu_temperature() -> float:
-        cpu_temp = CPUTemperature()
-        return cpu_temp.temperature
+        # The thermal zone reports millidegrees Celsius, the same file gpiozero's CPUTemperature reads
+        with open(_CPU_TEMPERATURE_PATH, 'r') as temperature:
+            return int(temperature.read()) / 1000
 
     @staticmethod
     def get_hardware_info() -> Optional[Dict[str, Any]]:
@@ -66,7 +93,7 @@ class System(ISystem):
             charger_data = System._get_charger_info()
             cpu_temp = System._get_cpu_temperature()
 
-        except subprocess.CalledProcessError as e:
+        except (OSError, ValueError) as e:
             logging.error(f"Failed to gather hardware info: {e}")
             return None
 
@@ -75,16 +102,35 @@ class System(ISystem):
             "cpu_temperature": cpu_temp,
             "battery_temperature": int(battery_data.get("battery_temperature", "0")),
             "battery_percentage": int(battery_data.get("POWER_SUPPLY_CAPACITY", "0")),
-            "battery_voltage_now": int(battery_data.get("POWER_SUPPLY_VOLTAGE_NOW", "0")) / 1000000,
-            "battery_voltage_avg": int(battery_data.get("POWER_SUPPLY_VOLTAGE_AVG", "0")) / 1000000,
-            "battery_current_now": int(battery_data.get("POWER_SUPPLY_CURRENT_NOW", "0")) / 1000000,
-            "battery_current_avg": int(battery_data.get("POWER_SUPPLY_CURRENT_AVG", "0")) / 1000000,
-            "charger_voltage_now": int(charger_data.get("POWER_SUPPLY_VOLTAGE_NOW", "0")) / 1000000,
-            "charger_current_now": int(charger_data.get("POWER_SUPPLY_CURRENT_NOW", "0")) / 1000000,
         }
+        sources = {"battery": battery_data, "charger": charger_data}
+        for name, source, key in _MICRO_UNIT_READINGS:
+            log_data[name] = int(sources[source].get(key, "0")) / 1000000
 
         return log_data
 
+    @staticmethod
+    def _local_time_to_epoch(wake_time: str) -> int:
+        """
+        Convert a local time of day into the Unix timestamp of its next occurrence.
+
+        Parameters
+        ----------
+        wake_time : str
+            The local time in HH:MM:SS or HH:MM format.
+
+        Returns
+        -------
+        int
+            The Unix timestamp of the time today, or tomorrow if it has already passed today.
+        """
+        time_format = "%H:%M:%S" if wake_time.count(":") == 2 else "%H:%M"
+        now = datetime.now()
+        target = datetime.combine(now.date(), datetime.strptime(wake_time, time_format).time())
+        if target <= now:
+            target += timedelta(days=1)
+        return int(target.timestamp())
+
     @staticmethod
     def schedule_wakeup(wake_time: Union[str, int, float]) -> None:
         """
@@ -93,25 +139,40 @@ class System(ISystem):
         Parameters
         ----------
         wake_time : str, int, float
-            The time at which the system should wake up.
-
-        Raises
-        ------
-        subprocess.CalledProcessError
-            If the rtcwake command fails to execute.
+            The local time of day at which the system should wake up,
+            or the number of seconds after which it should wake up.
+
+        Notes
+        -----
+        Scheduling the wake up is the last step before the shutdown, so the process is replaced
+        by rtcwake instead of waiting for it. The wrapper script handles the exit code of rtcwake
+        like the exit code of the script. If the process cannot be replaced, rtcwake is run as
+        a subprocess. If it fails or cannot be started either, the script exits with code 1.
         """
         try:
             if isinstance(wake_time, str):
-                cmd = f"sudo mrhat-rtcwake -d rtc0 -t $(date +%s -d 'today {wake_time}')"
+                cmd = ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-t', str(System._local_time_to_epoch(wake_time))]
             elif isinstance(wake_time, (int, float)):
-                cmd = f"sudo mrhat-rtcwake -d rtc0 -s {str(wake_time)}"
+                cmd = ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-s', str(wake_time)]
             else:
                 raise ValueError("wake_time must be a str, int, or float")
 
-            # Execute the command
-            subprocess.run(cmd, shell=True, check=True, capture_output=True, text=True)
+            # Nothing runs after the exec, so the logs are flushed first
+            for handler in logging.getLogger().handlers:
+                handler.flush()
+            try:
+                os.execvp(cmd[0], cmd)
+            except OSError as e:
+                logging.warning(f"Could not replace the process with rtcwake, running it instead: {e}")
+
+            # Execute the command directly, without a shell, only the error output is kept for the log
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
 
         except subprocess.CalledProcessError as e:
             logging.error(f"Failed to set RTC wake-up alarm: {e}")
             logging.error(f"rtcwake error output: {e.stderr}")
             exit(1)
+        except OSError as e:
+            # A missing sudo or mrhat-rtcwake makes the fallback fail the same way as the exec
+            logging.error(f"Failed to run rtcwake: {e}")
+            exit(1)
@@ -9,5 +9,7 @@ setup(
     packages=find_packages(),
     scripts=['bin/sentinel_mrhat_cam.sh', 'bin/sentinel_mrhat_cam_main.py'],
     data_files=[('config', ['config/sentinel_app_config.json', 'config/sentinel_log_config.yaml'])],
-    install_requires=['picamera2', 'PyYAML', 'pillow', 'pytz', 'paho-mqtt', 'numpy'],
+    install_requires=['PyYAML', 'pillow', 'paho-mqtt', 'numpy'],
+    # pybase64 is optional, the image is base64-encoded with the standard library without it
+    extras_require={'hardware': ['picamera2'], 'speedups': ['pybase64']},
 )
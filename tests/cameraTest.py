@@ -1,17 +1,41 @@
 import pytest
 import numpy as np
-import logging
-from unittest.mock import MagicMock, patch
-from sentinel_mrhat_cam import Camera
+from unittest.mock import Mock, patch
+from sentinel_mrhat_cam import Camera, ActiveConfig
+
+
+def active_config(quality):
+    return ActiveConfig(uuid="8D8AC610-566D-4EF0-9C22-186B2A5ED793", quality=quality,
+                        period=30, start="00:00:00", end="23:59:59")
+
+
+QUALITY_MAP = {
+    "4K": (3840, 2160),
+    "3K": (2560, 1440),
+    "HD": (1920, 1080),
+}
+
+
+def picamera2_mock():
+    # Only the Picamera2 members the camera uses, picamera2 is not installed off the device
+    mock = Mock(spec=["create_still_configuration", "configure", "options", "start", "capture_array"])
+    mock.options = {}
+    return mock
+
+
+@pytest.fixture(scope="session")
+def capture_image():
+    """A 3K frame allocated once, the tests only check its shape and identity."""
+    return np.zeros((2560, 1440, 3), dtype=np.uint8)
 
 
 class CameraTest:
     @pytest.fixture
     def camera(self):
-        with patch('sentinel_mrhat_cam.Picamera2') as mock_cam:
-            mock_instance = MagicMock()
+        with patch('sentinel_mrhat_cam.camera.Picamera2') as mock_cam:
+            mock_instance = picamera2_mock()
             mock_cam.return_value = mock_instance
-        camera = Camera({"quality": "invalid"})
+            camera = Camera(active_config("invalid"))
         return camera
 
     def test_invalid_camera_start(self, camera):
@@ -20,43 +44,33 @@ class CameraTest:
         camera._cam.configure.assert_called_once()
         camera._cam.start.assert_called_once_with(show_preview=False)
 
-    def test_camera_capture_success(self, camera):
-        mock_image = np.random.randint(0, 255, (2560, 1440, 3), dtype=np.uint8)
+    def test_camera_capture_success(self, camera, capture_image):
+        mock_image = capture_image
         camera._cam.capture_array.return_value = mock_image
         result = camera.capture()
         camera._cam.capture_array.assert_called_once()
         assert isinstance(result, np.ndarray)
         assert result.shape == (2560, 1440, 3)
-        np.testing.assert_array_equal(result, mock_image)
+        assert result is mock_image
 
     def test_camera_capture_failure(self, camera):
         camera._cam.capture_array.side_effect = Exception("Capture failed")
         result = camera.capture()
         assert result is None
 
-    @pytest.fixture(params=[
-        {"quality": "4K", "expected_width": 3840, "expected_height": 2160},
-        {"quality": "3K", "expected_width": 2560, "expected_height": 1440},
-        {"quality": "HD", "expected_width": 1920, "expected_height": 1080},
-    ])
-    def camera_with_quality(self, request, caplog):
-        caplog.set_level(logging.INFO)
-        with patch('sentinel_mrhat_cam.Picamera2') as mock_cam:
-            mock_instance = MagicMock()
-            mock_cam.return_value = mock_instance
-            camera = Camera({"quality": request.param["quality"]})
-            assert "Camera instance created" in caplog.text
-            return {
-                "camera": camera,
-                "mock_cam": mock_instance,
-                "expected_width": request.param["expected_width"],
-                "expected_height": request.param["expected_height"]
-            }
-
-    def test_camera_initialization(self, camera_with_quality, caplog):
-        camera_data = camera_with_quality
-        camera = camera_data["camera"]
-        assert camera._width == camera_data["expected_width"]
-        assert camera._height == camera_data["expected_height"]
-        if camera._config["quality"] == "invalid":
-            assert "Invalid quality specified" in caplog.text
+    @pytest.mark.parametrize("quality, expected_size", QUALITY_MAP.items())
+    def test_camera_initialization(self, quality, expected_size, caplog):
+        with patch('sentinel_mrhat_cam.camera.Picamera2') as mock_cam:
+            mock_cam.return_value = picamera2_mock()
+            camera = Camera(active_config(quality))
+        assert "Camera instance created" in caplog.text
+        assert (camera._width, camera._height) == expected_size
+
+    def test_camera_without_picamera2(self, caplog):
+        with patch('sentinel_mrhat_cam.camera.Picamera2', None):
+            camera = Camera(active_config("HD"))
+        camera.start()
+        assert "picamera2 is not available, the camera was not started" in caplog.text
+        assert camera.capture() is None
+        assert "picamera2 is not available, no image was captured" in caplog.text
+        assert "Error during image capture" not in caplog.text
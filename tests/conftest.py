@@ -0,0 +1,8 @@
+import logging
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def log_level():
+    """Let INFO records reach caplog without setting the level in every test."""
+    logging.getLogger().setLevel(logging.INFO)
@@ -1,6 +1,6 @@
 import pytest
-from unittest.mock import Mock, patch, MagicMock, mock_open
-from sentinel_mrhat_cam import Logger
+from unittest.mock import Mock, patch
+from sentinel_mrhat_cam import Logger, ICommunication
 import logging
 import yaml
 import logging.config
@@ -8,10 +8,45 @@ import threading
 from queue import Queue
 
 
+VALID_YAML_CONFIG = {
+    'version': 1,
+    'formatters': {
+        'standard': {
+            'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        }
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'standard'
+        }
+    },
+    'loggers': {
+        '': {
+            'handlers': ['console'],
+            'level': 'INFO'
+        }
+    }
+}
+
+# Built once, emit only formats the records
+LEVEL_RECORDS = [
+    logging.LogRecord("test", level, "test.py", 1, f"Test log at {logging.getLevelName(level)} level", (), None)
+    for level in (logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR, logging.CRITICAL)
+]
+
+
+@pytest.fixture(scope="session")
+def yaml_config_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("config") / "log.yaml"
+    path.write_text(yaml.safe_dump(VALID_YAML_CONFIG))
+    return path
+
+
 class LoggerTest:
     @pytest.fixture
     def logger(self):
-        mock_remote = Mock()
+        mock_remote = Mock(spec=ICommunication)
         mock_remote.is_connected.return_value = True
         logger = Logger()
         logger._remote = mock_remote
@@ -32,26 +67,7 @@ class LoggerTest:
 
     @pytest.fixture
     def valid_yaml_config(self):
-        return {
-            'version': 1,
-            'formatters': {
-                'standard': {
-                    'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-                }
-            },
-            'handlers': {
-                'console': {
-                    'class': 'logging.StreamHandler',
-                    'formatter': 'standard'
-                }
-            },
-            'loggers': {
-                '': {
-                    'handlers': ['console'],
-                    'level': 'INFO'
-                }
-            }
-        }
+        return VALID_YAML_CONFIG
 
     def test_publish_loop_empty_queue(self, logger):
         logger._publish_loop("test_topic")
@@ -70,19 +86,19 @@ class LoggerTest:
         with patch.object(logger._log_queue, 'get', side_effect=TimeoutError):
             logger._publish_loop("test_topic")
         logger._remote.send.assert_not_called()
-        assert "Log" in list(logger._log_queue.queue)  # Queue is not iterable
+        assert "Log" in logger._log_queue.queue
 
     def test_publish_loop_not_connected(self, logger):
         logger._log_queue.put("Log")
         logger._remote.is_connected.return_value = False
         logger._publish_loop("test_topic")
         logger._remote.send.assert_not_called()
-        assert "Log" in list(logger._log_queue.queue)
+        assert "Log" in logger._log_queue.queue
 
     def test_emit_no_start_event(self, logger, record):
         formatted_msg = logger.format(record)
         logger.emit(record)
-        assert formatted_msg in list(logger._log_queue.queue)
+        assert formatted_msg in logger._log_queue.queue
 
     def test_emit_successful_with_start_event(self, logger, record):
         logger._start_event.set()
@@ -95,7 +111,7 @@ class LoggerTest:
         assert logger._log_queue.empty()
 
     def test_start_remote_logging_sets_mqtt(self, logger):
-        mock_mqtt = MagicMock()
+        mock_mqtt = Mock(spec=ICommunication)
         logger.start_remote_logging(mock_mqtt)
         assert logger._remote == mock_mqtt
         assert logger._start_event.is_set() is True
@@ -111,42 +127,24 @@ class LoggerTest:
         assert logger.level == logging.INFO
         assert logger.formatter is not None
 
-    def test_emit_with_different_log_levels(self, logger):
+    @pytest.mark.parametrize("record", LEVEL_RECORDS, ids=lambda record: record.levelname)
+    def test_emit_with_different_log_levels(self, logger, record):
         """Test emit method with different log record levels."""
-        test_levels = [
-            logging.DEBUG,
-            logging.INFO,
-            logging.WARNING,
-            logging.ERROR,
-            logging.CRITICAL
-        ]
-        for level in test_levels:
-            record = logging.LogRecord(
-                name='test',
-                level=level,
-                pathname='test.py',
-                lineno=1,
-                msg=f"Test log at {logging.getLevelName(level)} level",
-                args=(),
-                exc_info=None
-            )
-            logger._log_queue.queue.clear()
-            logger.emit(record)
-            assert not logger._log_queue.empty()
-            formatted_msg = list(logger._log_queue.queue)[0]
-            assert f"Test log at {logging.getLevelName(level)} level" in formatted_msg
-            assert logging.getLevelName(level) in formatted_msg
-
-    def test_start_logging_file_not_exists(self, logger):
-        with patch('os.path.exists', return_value=False):
-            with pytest.raises(SystemExit):
-                with patch('builtins.exit', side_effect=SystemExit):
-                    logger.start_logging()
-
-    def test_start_logging_successful_configuration(self, logger, valid_yaml_config):
-        with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data=yaml.dump(valid_yaml_config))), \
-             patch('logging.config.dictConfig') as mock_dict_config, \
+        logger.emit(record)
+        assert not logger._log_queue.empty()
+        formatted_msg = logger._log_queue.queue[0]
+        assert f"Test log at {record.levelname} level" in formatted_msg
+        assert record.levelname in formatted_msg
+
+    def test_start_logging_file_not_exists(self, logger, tmp_path):
+        logger._filepath = tmp_path / "missing.yaml"
+        with pytest.raises(SystemExit):
+            with patch('builtins.exit', side_effect=SystemExit):
+                logger.start_logging()
+
+    def test_start_logging_successful_configuration(self, logger, valid_yaml_config, yaml_config_path):
+        logger._filepath = yaml_config_path
+        with patch('logging.config.dictConfig') as mock_dict_config, \
              patch('logging.getLogger') as mock_get_logger, \
              patch('logging.info') as mock_log_info:
             logger.start_logging()
@@ -154,10 +152,9 @@ class LoggerTest:
             mock_get_logger().addHandler.assert_called_once_with(logger)
             mock_log_info.assert_called_once_with("Logging started")
 
-    def test_start_logging_yaml_parse_error(self, logger):
-        with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data="invalid: yaml: config")), \
-             patch('yaml.safe_load', side_effect=yaml.YAMLError("Parsing error")):
-            with pytest.raises(SystemExit):
-                with patch('builtins.exit', side_effect=SystemExit):
-                    logger.start_logging()
+    def test_start_logging_yaml_parse_error(self, logger, tmp_path):
+        logger._filepath = tmp_path / "log.yaml"
+        logger._filepath.write_text("invalid: yaml: config")
+        with pytest.raises(SystemExit):
+            with patch('builtins.exit', side_effect=SystemExit):
+                logger.start_logging()
@@ -1,8 +1,12 @@
 from paho.mqtt import client as mqtt_client
-import base64
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 import logging
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append('/home/bence/Sentinel_MrHAT_Cam')
 from sentinel_mrhat_cam import BROKER
@@ -10,12 +14,12 @@ from sentinel_mrhat_cam import BROKER
 broker = BROKER
 port = 1883
 topic = "sentinel/cam1"
-logging.basicConfig(level=logging.DEBUG,
+logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                     datefmt='%Y-%m-%d %H:%M:%S',
                     handlers=[logging.StreamHandler()])
 
-# logging.Formatter.converter = lambda *args: datetime.now(pytz.utc).timetuple()
+# logging.Formatter.converter = time.gmtime
 
 
 def connect_mqtt() -> mqtt_client.Client:
@@ -25,21 +29,49 @@ def connect_mqtt() -> mqtt_client.Client:
         else:
             logging.info(f"Failed to connect, return code {rc}")
     client = mqtt_client.Client(mqtt_client.CallbackAPIVersion.VERSION2)
-    client.enable_logger()
     client.on_connect = on_connect
     client.connect(broker, port)
     return client
 
 
+IMAGE_PREFIX = b'{"image": "'
+
+# A single writer keeps the images in order and the disk writes off the network thread
+image_writer = ThreadPoolExecutor(max_workers=1)
+
+
+def parse_message(payload: bytes):
+    """
+    Split the image from the message without parsing it as JSON.
+
+    The camera puts the base64 image first, so the image is decoded straight from
+    a view of the payload and only the small remaining fields go through json.
+    """
+    if not payload.startswith(IMAGE_PREFIX):
+        message = json.loads(payload)
+        return base64.b64decode(message.pop('image'), validate=True), message
+    end = payload.index(b'"', len(IMAGE_PREFIX))
+    image_data = base64.b64decode(memoryview(payload)[len(IMAGE_PREFIX):end], validate=True)
+    # Skip the closing quote and the comma after the image
+    message = json.loads(b"{" + payload[end + 1:].lstrip(b", "))
+    return image_data, message
+
+
+def save_image(path: str, image_data: bytes):
+    try:
+        with open(path, "wb") as f:
+            f.write(image_data)
+        logging.info(f"Received and saved image to {path}")
+    except OSError as e:
+        logging.error(f"Failed to save image to {path}: {e}")
+
+
 def subscribe(client: mqtt_client.Client):
     def on_message(client, userdata, msg):
         try:
-            message = json.loads(msg.payload)
-            image_data = base64.b64decode(message['image'])
+            image_data, message = parse_message(msg.payload)
             output_image_path = f"images/image_{message['timestamp']}.jpg"
-            with open(output_image_path, "wb") as f:
-                f.write(image_data)
-            logging.info(f"Received and saved image to {output_image_path}")
+            image_writer.submit(save_image, output_image_path, image_data)
             logging.info(f"Message timestamp: {message['timestamp']}")
             logging.info(f"CPU temperature is: { message['cpuTemp']} °C")
             logging.info(f"Battery temperature is: {message['batteryTemp']} °C")
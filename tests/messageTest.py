@@ -1,7 +1,7 @@
 import pytest
+import logging
 import numpy as np
 import base64
-import logging
 import json
 from typing import Dict, Any
 from unittest.mock import mock_open, patch, MagicMock, Mock
@@ -68,11 +68,31 @@ def test_create_base64_image_succes():
     test_instance._camera.capture.return_value = test_image_array
 
     result = test_instance._create_base64_image()
-    assert isinstance(result, str)
+    assert isinstance(result, bytes)
     try:
-        base64.b64decode(result)
+        image_data = base64.b64decode(result)
     except Exception as e:
         pytest.fail(f"Base64 encoding failed: {e}")
+    # JPEG start of image marker
+    assert image_data[:2] == b"\xff\xd8"
+
+
+def test_create_base64_image_reuses_buffer():
+    test_instance = MessageCreator(camera=MagicMock(), rtc=MagicMock(), system=MagicMock())
+    noisy_image = np.random.default_rng(0).integers(0, 255, (100, 100, 3), dtype=np.uint8)
+    flat_image = np.full((100, 100, 3), 128, dtype=np.uint8)
+    buffer = test_instance._jpeg_buffer
+
+    test_instance._camera.capture.return_value = noisy_image
+    test_instance._create_base64_image()
+    test_instance._camera.capture.return_value = flat_image
+    result = test_instance._create_base64_image()
+
+    # The smaller second image must not carry the end of the first one
+    image_data = base64.b64decode(result)
+    assert image_data[-2:] == b"\xff\xd9"
+    assert len(image_data) == buffer.tell()
+    assert test_instance._jpeg_buffer is buffer
 
 
 def test_create_base64_image_no_image():
@@ -80,7 +100,7 @@ def test_create_base64_image_no_image():
     test_instance._camera.capture.return_value = None
 
     result = test_instance._create_base64_image()
-    assert result == "Error: Camera was unable to capture the image."
+    assert result == b"Error: Camera was unable to capture the image."
 
 
 def test_log_hardware_info_file_writing(sample_hardware_info):
@@ -95,20 +115,29 @@ def test_log_hardware_info_file_writing(sample_hardware_info):
 
 def test_log_hardware_info_logging(sample_hardware_info, caplog):
     test_instance = MessageCreator(camera=MagicMock(), rtc=MagicMock(), system=MagicMock())
-    caplog.set_level(logging.INFO)
     test_instance._log_hardware_info(sample_hardware_info)
 
-    log_records = [record.message for record in caplog.records]
-    # Verify specific log messages
-    assert f"battery_temperature: {sample_hardware_info['battery_temperature']}" in log_records
-    assert f"battery_percentage: {sample_hardware_info['battery_percentage']}" in log_records
-    assert f"cpu_temperature: {sample_hardware_info['cpu_temperature']}" in log_records
-    assert f"battery_voltage_now: {sample_hardware_info['battery_voltage_now']}" in log_records
-    assert f"battery_voltage_avg: {sample_hardware_info['battery_voltage_avg']}" in log_records
-    assert f"battery_current_now: {sample_hardware_info['battery_current_now']}" in log_records
-    assert f"battery_current_avg: {sample_hardware_info['battery_current_avg']}" in log_records
-    assert f"charger_voltage_now: {sample_hardware_info['charger_voltage_now']}" in log_records
-    assert f"charger_current_now: {sample_hardware_info['charger_current_now']}" in log_records
+    # All metrics are logged in a single record
+    assert len(caplog.records) == 1
+    log_message = caplog.records[0].message
+    assert f"battery_temperature: {sample_hardware_info['battery_temperature']}" in log_message
+    assert f"battery_percentage: {sample_hardware_info['battery_percentage']}" in log_message
+    assert f"cpu_temperature: {sample_hardware_info['cpu_temperature']}" in log_message
+    assert f"battery_voltage_now: {sample_hardware_info['battery_voltage_now']}" in log_message
+    assert f"battery_voltage_avg: {sample_hardware_info['battery_voltage_avg']}" in log_message
+    assert f"battery_current_now: {sample_hardware_info['battery_current_now']}" in log_message
+    assert f"battery_current_avg: {sample_hardware_info['battery_current_avg']}" in log_message
+    assert f"charger_voltage_now: {sample_hardware_info['charger_voltage_now']}" in log_message
+    assert f"charger_current_now: {sample_hardware_info['charger_current_now']}" in log_message
+
+
+def test_log_hardware_info_not_built_when_disabled(sample_hardware_info, caplog):
+    test_instance = MessageCreator(camera=MagicMock(), rtc=MagicMock(), system=MagicMock())
+    caplog.set_level(logging.WARNING)
+    with patch("builtins.open", mock_open()), \
+         patch("logging.info") as mock_log_info:
+        test_instance._log_hardware_info(sample_hardware_info)
+    mock_log_info.assert_not_called()
 
 
 def test_log_hardware_info_missing_key(sample_hardware_info):
@@ -139,8 +168,9 @@ def test_create_message_complete_flow(mock_system, mock_rtc):
         "charger_current_now": 1000
     }
     message_creator = MessageCreator(camera=mock_camera, rtc=mock_rtc, system=mock_system)
-    message_str = message_creator.create_message()
-    message_dict = json.loads(message_str)
+    message_bytes = message_creator.create_message()
+    assert isinstance(message_bytes, bytes)
+    message_dict = json.loads(message_bytes)
     assert 'timestamp' in message_dict
     assert 'image' in message_dict
     assert 'cpuTemp' in message_dict
@@ -150,6 +180,7 @@ def test_create_message_complete_flow(mock_system, mock_rtc):
     assert message_dict['cpuTemp'] == 45.5
     assert message_dict['batteryTemp'] == 30.2
     assert message_dict['batteryCharge'] == 85
+    assert base64.b64decode(message_dict['image'])[:2] == b"\xff\xd8"
 
 
 @pytest.mark.parametrize("missing_key", [
@@ -169,3 +200,11 @@ def test_log_hardware_info_missing_keys(sample_hardware_info, missing_key):
     del incomplete_hardware_info[missing_key]
     with pytest.raises(KeyError, match=missing_key):
         test_instance._log_hardware_info(incomplete_hardware_info)
+
+
+def test_create_message_no_timestamp(mock_system, mock_rtc):
+    mock_camera = MagicMock()
+    mock_rtc.get_time.return_value = None
+    message_creator = MessageCreator(camera=mock_camera, rtc=mock_rtc, system=mock_system)
+    assert message_creator.create_message() is None
+    mock_camera.capture.assert_not_called()
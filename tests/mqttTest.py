@@ -1,5 +1,4 @@
 import pytest
-import logging
 from unittest.mock import MagicMock, patch
 from sentinel_mrhat_cam import (
     MQTT, BROKER, PORT, QOS,
@@ -30,6 +29,39 @@ class MQTTTest:
         mock_mqtt.client.connect.assert_called_with(BROKER, PORT)
         mock_mqtt.client.loop_start.assert_called_once()
 
+    def test_connect_resets_broker_counter(self, mock_mqtt):
+        mock_mqtt._broker_connect_counter = 5
+        with patch("sentinel_mrhat_cam.MQTT._is_broker_available", return_value=True):
+            mock_mqtt.connect()
+        assert mock_mqtt._broker_connect_counter == 0
+
+    def test_subscribes_before_connect_returns(self, mock_mqtt):
+        calls = []
+        mock_mqtt.client.subscribe.side_effect = lambda topic: calls.append("subscribe")
+        mock_mqtt.client.loop_start.side_effect = lambda: calls.append("loop_start")
+        with patch("sentinel_mrhat_cam.MQTT._is_broker_available", return_value=True):
+            mock_mqtt.connect()
+        mock_mqtt.client.subscribe.assert_called_once_with(mock_mqtt._subtopic)
+        assert calls == ["subscribe", "loop_start"]
+
+    def test_subscribes_on_every_connect(self, mock_mqtt):
+        with patch("sentinel_mrhat_cam.MQTT._is_broker_available", return_value=True):
+            mock_mqtt.connect()
+        mock_mqtt.client.subscribe.reset_mock()
+        on_connect = mock_mqtt.client.on_connect
+        on_connect(mock_mqtt.client, None, None, 0, None)
+        # paho calls on_connect again after reconnecting on its own
+        on_connect(mock_mqtt.client, None, None, 0, None)
+        assert mock_mqtt.client.subscribe.call_count == 2
+        mock_mqtt.client.subscribe.assert_called_with(mock_mqtt._subtopic)
+
+    def test_no_subscribe_on_failed_connect(self, mock_mqtt):
+        with patch("sentinel_mrhat_cam.MQTT._is_broker_available", return_value=True):
+            mock_mqtt.connect()
+        mock_mqtt.client.subscribe.reset_mock()
+        mock_mqtt.client.on_connect(mock_mqtt.client, None, None, 5, None)
+        mock_mqtt.client.subscribe.assert_not_called()
+
     def test_disconnect(self, mock_mqtt):
         mock_mqtt.disconnect()
         mock_mqtt.client.loop_stop.assert_called_once()
@@ -48,7 +80,6 @@ class MQTTTest:
             assert mock_mqtt._broker_connect_counter == 0
 
     def test_broker_check_failure(self, mock_mqtt, caplog):
-        caplog.set_level(logging.INFO)
         mock_mqtt._broker_connect_counter = 19
         with patch.object(mock_mqtt, "_is_broker_available", return_value=False):
             with pytest.raises(SystemExit):
@@ -61,6 +92,7 @@ class MQTTTest:
     def test_broker_available(self, mock_create_connection, mock_mqtt):
         mock_create_connection.return_value = MagicMock()
         assert mock_mqtt._is_broker_available() is True
+        mock_create_connection.return_value.__exit__.assert_called_once()
 
     @patch("socket.create_connection")
     def test_broker_unavailable(self, mock_create_connection, mock_mqtt):
@@ -69,7 +101,6 @@ class MQTTTest:
 
     @patch("socket.create_connection")
     def test_unexpected_exception(self, mock_create_connection, mock_mqtt, caplog):
-        caplog.set_level(logging.INFO)
         mock_create_connection.side_effect = Exception("Unexpected error")
         with pytest.raises(SystemExit):
             mock_mqtt._is_broker_available()
@@ -99,7 +130,6 @@ class MQTTTest:
 
     @patch("sentinel_mrhat_cam.MAX_WAIT_TIME_FOR_CONFG", 0.001)
     def test_wait_for_config(self, mock_mqtt, caplog):
-        caplog.set_level(logging.INFO)
         mock_mqtt.config_received_event.set()
         mock_mqtt.new_config = True
         result = mock_mqtt.wait_for_config()
@@ -117,6 +147,14 @@ class MQTTTest:
             assert sentinel_mrhat_cam.mqtt_client is not None
             assert sentinel_mrhat_cam.mqtt_enums is not None
 
+    def test_wait_for_config_update_received(self, mock_mqtt):
+        mock_mqtt.config_updated_event.set()
+        assert mock_mqtt.wait_for_config_update(0.001) is True
+        assert mock_mqtt.config_updated_event.is_set() is False
+
+    def test_wait_for_config_update_timeout(self, mock_mqtt):
+        assert mock_mqtt.wait_for_config_update(0.001) is False
+
     def test_clear_config_received(self, mock_mqtt):
         mock_mqtt.config_received_event.set()
         mock_mqtt.clear_config_received()
@@ -1,6 +1,5 @@
 import pytest
 import subprocess
-import datetime
 from unittest.mock import patch, MagicMock
 from sentinel_mrhat_cam import RTC
 
@@ -14,8 +13,7 @@ class RTCTest:
         ]
         mock_get_timedatectl.return_value = mock_lines
         extracted_time = RTC._extract_time(mock_lines, "RTC time:")
-        assert isinstance(extracted_time, datetime.datetime)
-        assert extracted_time.strftime("%H:%M:%S") == "14:30:45"
+        assert extracted_time == 14 * 3600 + 30 * 60 + 45
 
     def test_extract_time_no_match(self):
         mock_lines = ["No time here"]
@@ -81,16 +79,50 @@ class RTCTest:
     def test_sync_system_to_ntp_failure(self, mock_sleep, mock_find_line, mock_get_timedatectl):
         mock_get_timedatectl.return_value = ["mock lines"]
         mock_find_line.return_value = "no"
-        with pytest.raises(SystemExit):
-            RTC._sync_system_to_ntp(max_retries=1)
+        assert RTC._sync_system_to_ntp(max_retries=1) is False
 
     @patch('sentinel_mrhat_cam.RTC._get_timedatectl')
     @patch('sentinel_mrhat_cam.RTC._extract_time')
     def test_get_time_no_sync(self, mock_extract_time, mock_get_timedatectl):
         # Mock times with a difference less than 2 seconds
-        rtc_time = datetime.datetime(2024, 11, 15, 14, 30, 0)
-        utc_time = datetime.datetime(2024, 11, 15, 14, 30, 1)
+        rtc_time = 14 * 3600 + 30 * 60
+        utc_time = 14 * 3600 + 30 * 60 + 1
         mock_get_timedatectl.return_value = ["mock lines"]
         mock_extract_time.side_effect = [rtc_time, utc_time]
         time_str = RTC.get_time()
         assert time_str == "14:30:01"
+        mock_get_timedatectl.assert_called_once()
+
+    @patch('sentinel_mrhat_cam.RTC._get_timedatectl')
+    def test_get_time_failure(self, mock_get_timedatectl):
+        mock_get_timedatectl.side_effect = Exception("Error getting date from timedatectl")
+        assert RTC.get_time() is None
+
+    @patch('sentinel_mrhat_cam.RTC._sync_system_to_ntp', return_value=False)
+    @patch('sentinel_mrhat_cam.RTC._sync_RTC_to_system')
+    @patch('sentinel_mrhat_cam.RTC._get_timedatectl')
+    @patch('sentinel_mrhat_cam.RTC._extract_time')
+    def test_get_time_ntp_sync_failure(self, mock_extract_time, mock_get_timedatectl, mock_sync_rtc, mock_sync_ntp):
+        mock_get_timedatectl.return_value = ["mock lines"]
+        mock_extract_time.side_effect = [14 * 3600, 14 * 3600 + 10]
+        assert RTC.get_time() is None
+        mock_sync_rtc.assert_not_called()
+
+    def test_parse_time_cached(self):
+        RTC.parse_time.cache_clear()
+        assert RTC.parse_time("07:30:05") == RTC.parse_time("07:30:05")
+        assert RTC.parse_time("07:30:05").hour == 7
+        assert RTC.parse_time.cache_info().hits == 2
+
+    def test_to_epoch(self):
+        midnight = RTC.to_epoch("00:00:00")
+        assert midnight % 86400 == 0
+        assert RTC.to_epoch("12:30:15") - midnight == 12 * 3600 + 30 * 60 + 15
+
+    @pytest.mark.parametrize("seconds, expected", [
+        (0, "00:00:00"),
+        (14 * 3600 + 30 * 60 + 1, "14:30:01"),
+        (23 * 3600 + 59 * 60 + 59, "23:59:59")
+    ])
+    def test_format_time(self, seconds, expected):
+        assert RTC._format_time(seconds) == expected
@@ -1,63 +1,103 @@
 import pytest
 import time
-from unittest.mock import MagicMock
+import logging
+from unittest.mock import MagicMock, patch
 from sentinel_mrhat_cam import (
     Context,
+    State,
     InitState,
     CreateMessageState,
     ConfigCheckState,
     TransmitState,
     IdleState,
-    SHUTDOWN_THRESHOLD
+    RetryState,
+    SHUTDOWN_THRESHOLD,
+    MAX_RETRY_COUNT,
+    UUID_TOPIC,
+    SHUTDOWN_UNTIL_END,
+    SHUTDOWN_FOR_DURATION,
+    SLEEP_UNTIL_NEXT_CYCLE
 )
 
 
-def test_log_and_save_execution_time():
-    Context.runtime = 0
-
-    @Context.log_and_save_execution_time("Test Function")
-    def test_function():
+class SleepState(State):
+    def handle(self, app):
         time.sleep(0.5)
 
-    test_function()
+
+def test_request_saves_execution_time():
+    Context.runtime = 0
+    app_mock = MagicMock()
+    app_mock._state = SleepState()
+    Context.request(app_mock)
     assert pytest.approx(Context.runtime, 0.1) == 0.5
 
 
+def test_request_skips_untimed_state():
+    Context.runtime = 0
+    app_mock = MagicMock()
+    app_mock._state = IdleState()
+    app_mock.config.period = 0
+    app_mock.config.shutdown_mode = SLEEP_UNTIL_NEXT_CYCLE
+    app_mock.runtime = 0.0
+    Context.request(app_mock)
+    assert Context.runtime == 0
+
+
 def test_schedule_sleep_until_next_cycle():
     app_mock = MagicMock()
     test_state = IdleState()
     waiting_time = 0.1
-    period = 0.5
-    test_state._schedule_next_cycle(app_mock, period, waiting_time)
+    app_mock.config.shutdown_mode = SLEEP_UNTIL_NEXT_CYCLE
+    app_mock.communication.wait_for_config_update.return_value = False
+    test_state._schedule_next_cycle(app_mock, waiting_time)
+    app_mock.communication.wait_for_config_update.assert_called_once_with(waiting_time)
+    app_mock.config.load.assert_not_called()
+    app_mock.config.refresh_active.assert_called_once()
     app_mock.reset_runtime.assert_called_once()
     app_mock.set_state.assert_called_once()
 
 
+def test_schedule_sleep_new_config_received():
+    app_mock = MagicMock()
+    test_state = IdleState()
+    app_mock.config.shutdown_mode = SLEEP_UNTIL_NEXT_CYCLE
+    app_mock.communication.wait_for_config_update.return_value = True
+    test_state._schedule_next_cycle(app_mock, 5)
+    app_mock.config.load.assert_called_once()
+    app_mock.config.refresh_active.assert_not_called()
+    app_mock.communication.disconnect.assert_not_called()
+    assert isinstance(app_mock.set_state.call_args[0][0], CreateMessageState)
+
+
 def test_negative_period_shutdown():
     app_mock = MagicMock()
     test_state = IdleState()
-    waiting_time = 10
-    period = -1
-    test_state._schedule_next_cycle(app_mock, period, waiting_time)
-    app_mock.rtc.localize_time.assert_called_once()
+    app_mock.config.shutdown_mode = SHUTDOWN_UNTIL_END
+    app_mock.config.end_epoch = 1_700_003_600
+    with patch("time.time", return_value=1_700_000_000.5):
+        test_state._schedule_next_cycle(app_mock, 10)
+    app_mock.communication.disconnect.assert_called_once()
+    app_mock.system.schedule_wakeup.assert_called_once_with(3600)
 
 
 def test_schedule_shutdown_until_next_cycle():
     app_mock = MagicMock()
     test_state = IdleState()
     waiting_time = SHUTDOWN_THRESHOLD + 10
-    period = 10
-    test_state._schedule_next_cycle(app_mock, period, waiting_time)
+    app_mock.config.shutdown_mode = SHUTDOWN_FOR_DURATION
+    test_state._schedule_next_cycle(app_mock, waiting_time)
     app_mock.logger.stop_remote_logging.assert_called_once()
 
 
-def test_no_connection_in_CreateMessageState():
+def test_schedule_short_wait_sleeps_instead_of_shutdown():
     app_mock = MagicMock()
-    test_state = CreateMessageState()
-    app_mock.communication.is_connected.return_value = False
-    test_state.handle(app_mock)
-    app_mock.communication.connect.assert_called_once()
-    app_mock.logger.start_remote_logging.assert_called_once()
+    test_state = IdleState()
+    app_mock.config.shutdown_mode = SHUTDOWN_FOR_DURATION
+    app_mock.communication.wait_for_config_update.return_value = False
+    test_state._schedule_next_cycle(app_mock, SHUTDOWN_THRESHOLD - 1)
+    app_mock.communication.wait_for_config_update.assert_called_once_with(SHUTDOWN_THRESHOLD - 1)
+    app_mock.logger.stop_remote_logging.assert_not_called()
 
 
 def test_init_state_camera_start():
@@ -65,13 +105,24 @@ def test_init_state_camera_start():
     test_state = InitState()
     test_state.handle(app_mock)
     app_mock.camera.start.assert_called_once()
+    app_mock.communication.connect.assert_called_once()
+    app_mock.logger.start_remote_logging.assert_called_once_with(app_mock.communication)
     app_mock.set_state.assert_called_once()
     assert isinstance(app_mock.set_state.call_args[0][0], CreateMessageState)
 
 
-def test_create_message_state_with_connection():
+def test_init_state_connect_failure():
+    app_mock = MagicMock()
+    app_mock.communication.connect.side_effect = SystemExit(1)
+    test_state = InitState()
+    with pytest.raises(SystemExit):
+        test_state.handle(app_mock)
+    app_mock.camera.start.assert_called_once()
+    app_mock.set_state.assert_not_called()
+
+
+def test_create_message_state_keeps_connection():
     app_mock = MagicMock()
-    app_mock.communication.is_connected.return_value = True
     test_state = CreateMessageState()
     test_state.handle(app_mock)
     app_mock.message_creator.create_message.assert_called_once()
@@ -81,11 +132,22 @@ def test_create_message_state_with_connection():
     assert isinstance(app_mock.set_state.call_args[0][0], ConfigCheckState)
 
 
+def test_create_message_state_sends_uuid_before_capture():
+    app_mock = MagicMock()
+    app_mock.config.active.uuid = "test-uuid"
+    CreateMessageState().handle(app_mock)
+    calls = [name for name, _, _ in app_mock.mock_calls]
+    assert calls.index("communication.send") < calls.index("message_creator.create_message")
+    app_mock.communication.send.assert_called_once_with("test-uuid", UUID_TOPIC)
+    app_mock.communication.clear_config_received.assert_called_once()
+
+
 def test_config_check_state_no_new_config():
     app_mock = MagicMock()
     app_mock.communication.wait_for_config.return_value = False
     test_state = ConfigCheckState()
     test_state.handle(app_mock)
+    app_mock.communication.send.assert_not_called()
     app_mock.config.load.assert_not_called()
     app_mock.set_state.assert_called_once()
     assert isinstance(app_mock.set_state.call_args[0][0], TransmitState)
@@ -102,10 +164,62 @@ def test_transmit_state():
 
 def test_idle_state_zero_period():
     app_mock = MagicMock()
-    app_mock.config.active = {"period": 0}
+    app_mock.config.period = 0
+    app_mock.config.shutdown_mode = SLEEP_UNTIL_NEXT_CYCLE
     app_mock.runtime = 1.0
     test_state = IdleState()
     test_state.handle(app_mock)
     app_mock.reset_runtime.assert_called_once()
     app_mock.set_state.assert_called_once()
     assert isinstance(app_mock.set_state.call_args[0][0], CreateMessageState)
+
+
+def test_create_message_state_failure():
+    app_mock = MagicMock()
+    app_mock.message_creator.create_message.return_value = None
+    test_state = CreateMessageState()
+    test_state.handle(app_mock)
+    app_mock.set_state.assert_called_once()
+    assert isinstance(app_mock.set_state.call_args[0][0], RetryState)
+
+
+@patch("time.sleep")
+def test_retry_state(mock_sleep):
+    app_mock = MagicMock()
+    app_mock.retry_count = 0
+    test_state = RetryState()
+    test_state.handle(app_mock)
+    assert app_mock.retry_count == 1
+    mock_sleep.assert_called_once()
+    assert isinstance(app_mock.set_state.call_args[0][0], CreateMessageState)
+
+
+@patch("time.sleep")
+def test_retry_state_max_retries(mock_sleep):
+    app_mock = MagicMock()
+    app_mock.retry_count = MAX_RETRY_COUNT
+    test_state = RetryState()
+    with pytest.raises(SystemExit):
+        test_state.handle(app_mock)
+    mock_sleep.assert_not_called()
+
+
+def test_transitions_reuse_state_instances():
+    first_app, second_app = MagicMock(), MagicMock()
+    TransmitState().handle(first_app)
+    TransmitState().handle(second_app)
+    assert first_app.set_state.call_args[0][0] is second_app.set_state.call_args[0][0]
+
+
+def test_base_state_handle_not_implemented():
+    with pytest.raises(NotImplementedError):
+        State().handle(MagicMock())
+
+
+def test_state_entry_logged_at_debug(caplog):
+    caplog.set_level(logging.INFO)
+    TransmitState().handle(MagicMock())
+    assert "In TransmitState" not in caplog.text
+    caplog.set_level(logging.DEBUG)
+    TransmitState().handle(MagicMock())
+    assert "In TransmitState" in caplog.text
@@ -1,7 +1,25 @@
 import pytest
 import subprocess
-from unittest.mock import patch, Mock, MagicMock
-from sentinel_mrhat_cam import System
+import time
+from datetime import datetime
+from unittest.mock import patch, Mock, mock_open
+from sentinel_mrhat_cam import System, CHARGER_BACKOFF_MIN, CHARGER_BACKOFF_MAX
+
+
+@pytest.fixture(autouse=True)
+def exec_unavailable():
+    """The tests must never replace the test process, so exec fails unless a test patches it."""
+    with patch('os.execvp', side_effect=OSError("exec disabled in tests")) as mock_exec:
+        yield mock_exec
+
+
+def test_schedule_wakeup_replaces_process(exec_unavailable):
+    exec_unavailable.side_effect = None
+    with patch('subprocess.run') as mock_run:
+        System.schedule_wakeup(40)
+    exec_unavailable.assert_called_once_with('sudo', ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-s', '40'])
+    # The exec never returns on the device, the mock returning falls through to the subprocess
+    mock_run.assert_called_once()
 
 
 def test_schedule_wakeup_invalid_wake_time_type():
@@ -14,7 +32,7 @@ def test_schedule_wakeup_invalid_wake_time_type():
 def test_schedule_wakeup_subprocess_error(mock_run, caplog):
     mock_run.side_effect = subprocess.CalledProcessError(
         returncode=1,
-        cmd="sudo mrhat-rtcwake -d rtc0 -t $(date +%s -d 'today 06:00')",
+        cmd=['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-s', '3600'],
         stderr="Error executing rtcwake"
     )
     test = System()
@@ -24,28 +42,44 @@ def test_schedule_wakeup_subprocess_error(mock_run, caplog):
     assert "Error executing rtcwake" in caplog.text
 
 
+def test_schedule_wakeup_missing_binary(exec_unavailable, caplog):
+    exec_unavailable.side_effect = FileNotFoundError("No such file or directory: 'sudo'")
+    with patch('subprocess.run', side_effect=FileNotFoundError("No such file or directory: 'sudo'")):
+        with pytest.raises(SystemExit):
+            System.schedule_wakeup(3600)
+    assert "Failed to run rtcwake" in caplog.text
+
+
 @pytest.mark.parametrize("wake_time, expected_cmd", [
     # Test string time input
-    ("22:00", "sudo mrhat-rtcwake -d rtc0 -t $(date +%s -d 'today 22:00')"),
+    ("22:00", ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-t', '1700000000']),
     # Test integer seconds input
-    (40, "sudo mrhat-rtcwake -d rtc0 -s 40"),
+    (40, ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-s', '40']),
     # Test float seconds input
-    (36.5, "sudo mrhat-rtcwake -d rtc0 -s 36.5")
+    (36.5, ['sudo', 'mrhat-rtcwake', '-d', 'rtc0', '-s', '36.5'])
 ])
 def test_schedule_wakeup_valid_wake_time_inputs(wake_time, expected_cmd):
     test = System()
-    with patch('subprocess.run') as mock_run:
+    with patch('subprocess.run') as mock_run, \
+         patch.object(System, '_local_time_to_epoch', return_value=1700000000):
         mock_run.return_value = Mock()
         test.schedule_wakeup(wake_time)
         mock_run.assert_called_once_with(
             expected_cmd,
-            shell=True,
             check=True,
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             text=True
         )
 
 
+@pytest.mark.parametrize("wake_time", ["22:00", "06:30:15"])
+def test_local_time_to_epoch(wake_time):
+    epoch = System._local_time_to_epoch(wake_time)
+    assert 0 < epoch - time.time() <= 24 * 3600
+    assert datetime.fromtimestamp(epoch).strftime("%H:%M:%S").startswith(wake_time)
+
+
 def test_schedule_wakeup_logging():
     test = System()
     with patch('subprocess.run') as mock_run, \
@@ -67,59 +101,109 @@ def test_schedule_wakeup_logging():
         assert "rtcwake error output: Detailed error message" in second_call
 
 
-def test_get_battery_info_subprocess_error():
+@pytest.fixture(autouse=True)
+def reset_charger_backoff():
+    with patch.object(System, '_charger_retry_time', 0.0), \
+         patch.object(System, '_charger_backoff', CHARGER_BACKOFF_MIN):
+        yield
+
+
+BATTERY_UEVENT = "POWER_SUPPLY_CAPACITY=85\nPOWER_SUPPLY_VOLTAGE_NOW=4200000\n"
+CHARGER_UEVENT = "POWER_SUPPLY_VOLTAGE_NOW=5000000\nPOWER_SUPPLY_CURRENT_NOW=1000000\n"
+
+
+def test_get_battery_info_read_error():
     test = System()
-    with patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'cat')):
-        with pytest.raises(subprocess.CalledProcessError):
+    with patch('builtins.open', side_effect=OSError):
+        with pytest.raises(OSError):
             test._get_battery_info()
 
 
-def test_get_battery_info_invalid_uevent_data_format():
-    mock_battery_uevent = b"""Invalid data format"""
-    with patch('subprocess.run') as mock_run:
-        test = System()
-        # First call (cat uevent)
-        first_call = MagicMock()
-        first_call.stdout = mock_battery_uevent
-        mock_run.side_effect = first_call
-        result = test._get_battery_info()
-        assert isinstance(result, dict)
-
-
-def test_get_battery_info_invalid_upower_data_format():
-    mock_upower_output = b"""
-    battery (/org/freedesktop/UPower/devices/battery_bq2562x_battery)
-      temperature:             invalid temperature
-    """
-    with patch('subprocess.run') as mock_run:
-        test = System()
-        # First call (cat uevent)
-        first_call = MagicMock()
-        first_call.stdout = mock_upower_output
-        mock_run.side_effect = first_call
-        result = test._get_battery_info()
-        assert isinstance(result, dict)
+def test_get_battery_info_uevent_data():
+    battery_uevent = BATTERY_UEVENT + "POWER_SUPPLY_TEMP=385\n"
+    with patch('builtins.open', mock_open(read_data=battery_uevent)) as mocked_open:
+        result = System()._get_battery_info()
+    mocked_open.assert_called_once_with('/sys/class/power_supply/bq2562x-battery/uevent', 'r')
+    assert result["POWER_SUPPLY_CAPACITY"] == "85"
+    assert result["POWER_SUPPLY_VOLTAGE_NOW"] == "4200000"
+    assert result["battery_temperature"] == 38.5
+
+
+def test_get_battery_info_without_temperature():
+    with patch('builtins.open', mock_open(read_data=BATTERY_UEVENT)):
+        result = System()._get_battery_info()
+    assert "battery_temperature" not in result
+
+
+def test_get_battery_info_invalid_temperature():
+    battery_uevent = BATTERY_UEVENT + "POWER_SUPPLY_TEMP=invalid\n"
+    with patch('builtins.open', mock_open(read_data=battery_uevent)):
+        with pytest.raises(ValueError):
+            System()._get_battery_info()
 
 
 def test_get_charger_info_valid_data():
     test = System()
-    mock_charger_uevent = b"""Invalid data format Without proper key=value pairs"""
-    with patch('subprocess.run') as mock_run:
-        mock_call = MagicMock()
-        mock_call.stdout = mock_charger_uevent
-        mock_run.return_value = mock_call
-
+    with patch('builtins.open', mock_open(read_data=CHARGER_UEVENT)) as mocked_open:
         output = test._get_charger_info()
-        assert isinstance(output, dict)
+    mocked_open.assert_called_once_with('/sys/class/power_supply/bq2562x-charger/uevent', 'r')
+    assert output == {"POWER_SUPPLY_VOLTAGE_NOW": "5000000", "POWER_SUPPLY_CURRENT_NOW": "1000000"}
+
 
+def test_read_uevent_malformed_lines():
+    uevent = "POWER_SUPPLY_NAME=bq2562x-charger\nmalformed line\n\nPOWER_SUPPLY_MODEL_NAME=a=b\n"
+    with patch('builtins.open', mock_open(read_data=uevent)):
+        result = System._read_uevent('/sys/class/power_supply/bq2562x-charger/uevent')
+    assert result == {"POWER_SUPPLY_NAME": "bq2562x-charger", "POWER_SUPPLY_MODEL_NAME": "a=b"}
 
-def test_get_charger_info_subprocess_error():
+
+def test_get_charger_info_read_error():
     test = System()
-    with patch('subprocess.run', side_effect=subprocess.CalledProcessError(1, 'cat')):
-        with pytest.raises(subprocess.CalledProcessError):
+    with patch('builtins.open', side_effect=OSError):
+        with pytest.raises(OSError):
             test._get_charger_info()
 
 
+def test_get_charger_info_missing_charger_backoff(caplog):
+    with patch('builtins.open', side_effect=FileNotFoundError) as mocked_open, \
+         patch('time.monotonic', side_effect=[100.0, 100.0 + CHARGER_BACKOFF_MIN - 1, 100.0 + CHARGER_BACKOFF_MIN]):
+        assert System._get_charger_info() == {}
+        # Not read again until the back-off has passed
+        assert System._get_charger_info() == {}
+        assert mocked_open.call_count == 1
+        assert System._get_charger_info() == {}
+        assert mocked_open.call_count == 2
+    assert System._charger_backoff == min(CHARGER_BACKOFF_MIN * 4, CHARGER_BACKOFF_MAX)
+    assert "Charger not found" in caplog.text
+
+
+def test_get_charger_info_found_resets_backoff():
+    with patch.object(System, '_charger_backoff', CHARGER_BACKOFF_MAX), \
+         patch('builtins.open', mock_open(read_data=CHARGER_UEVENT)):
+        assert System._get_charger_info()["POWER_SUPPLY_VOLTAGE_NOW"] == "5000000"
+        assert System._charger_backoff == CHARGER_BACKOFF_MIN
+
+
+def test_get_hardware_info_read_error(caplog):
+    with patch.object(System, '_get_battery_info', side_effect=OSError("No such file")):
+        assert System.get_hardware_info() is None
+    assert "Failed to gather hardware info" in caplog.text
+
+
+def test_get_cpu_temperature():
+    with patch('builtins.open', mock_open(read_data="45500\n")) as mocked_open:
+        assert System._get_cpu_temperature() == 45.5
+    mocked_open.assert_called_once_with('/sys/class/thermal/thermal_zone0/temp', 'r')
+
+
+def test_get_cpu_temperature_read_error(caplog):
+    with patch.object(System, '_get_battery_info', return_value={}), \
+         patch.object(System, '_get_charger_info', return_value={}), \
+         patch('builtins.open', side_effect=OSError("No such file")):
+        assert System.get_hardware_info() is None
+    assert "Failed to gather hardware info" in caplog.text
+
+
 def test_get_hardware_info_successful_retrieval():
     test = System()
     mock_battery_data = {